@@ -0,0 +1,18 @@
+import json
+import os
+
+
+def app_data_dir():
+    """Папка для данных приложения (%APPDATA%\\WinWeather в Windows)"""
+    base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".config")
+    path = os.path.join(base, "WinWeather")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def write_json_atomic(path, data):
+    """Записать JSON через временный файл, чтобы не оставить файл наполовину записанным"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tkinter as tk
+from AppFiles import app_data_dir
+
+# Версия формата кэша картинок (при изменении способа подготовки - увеличить)
+ASSET_CACHE_VERSION = 1
+
+
+def dpi_scale(root):
+    """Масштаб экрана относительно 96 DPI (с шагом 25%, не меньше 1)"""
+    return max(1.0, round(root.winfo_fpixels('1i') / 96 * 4) / 4)
+
+
+class AssetCache:
+    """Картинки интерфейса, готовые к показу. Уменьшенная копия каждого размера создаётся
+    один раз и хранится в assets/<версия приложения>-<версия кэша>/<масштаб>x/ в папке данных:
+    при следующих запусках Tk читает готовый PNG сам, без декодирования исходника и LANCZOS"""
+
+    def __init__(self, root, app_version, path=None, scale=None):
+        self.root = root
+        self.scale = dpi_scale(root) if scale is None else scale
+        base = path or os.path.join(app_data_dir(), "assets")
+        version = f"{app_version}-{ASSET_CACHE_VERSION}"
+        self._remove_stale(base, version)
+        self.path = os.path.join(base, version, f"{self.scale:g}x")
+        self.photos = {}  # (исходник, размер) -> PhotoImage (только из главного потока)
+
+    @staticmethod
+    def _remove_stale(base, version):
+        """Удалить кэш от прежних версий приложения"""
+        try:
+            entries = os.listdir(base)
+        except OSError:
+            return
+        for entry in entries:
+            if entry != version:
+                shutil.rmtree(os.path.join(base, entry), ignore_errors=True)
+
+    def scaled(self, size):
+        """Размер в пикселях экрана для размера, заданного при 96 DPI"""
+        return tuple(max(1, round(value * self.scale)) for value in size)
+
+    def photo(self, source, size):
+        """PhotoImage исходной картинки source размера size (при 96 DPI). Повторно не загружается"""
+        key = (source, size)
+        photo = self.photos.get(key)
+        if photo is None:
+            photo = self._load(source, self.scaled(size))
+            self.photos[key] = photo
+        return photo
+
+    def _load(self, source, size):
+        name = os.path.splitext(os.path.basename(source))[0]
+        cached = os.path.join(self.path, f"{name}_{size[0]}x{size[1]}.png")
+        if os.path.exists(cached):
+            try:
+                return tk.PhotoImage(master=self.root, file=cached)
+            except tk.TclError:
+                pass  # файл повреждён - создаём заново
+
+        # PIL нужен только для подготовки новой картинки - готовый PNG Tk читает сам
+        from PIL import Image, ImageTk
+        image = Image.open(source).convert("RGBA").resize(size, Image.LANCZOS)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            image.save(cached + ".tmp", "PNG")
+            os.replace(cached + ".tmp", cached)
+        except OSError as e:
+            print(f"Не удалось сохранить картинку {name} в кэш: {e}")
+        return ImageTk.PhotoImage(image, master=self.root)
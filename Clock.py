@@ -0,0 +1,69 @@
+import re
+import time
+from datetime import datetime
+
+# Директивы strftime, зависящие только от даты (их значение меняется раз в сутки)
+DATE_DIRECTIVES = set("aAbBdjmUwWxyYGguV")
+# Директивы, с которыми часы должны обновляться каждую секунду (иначе - раз в минуту)
+SECOND_DIRECTIVES = set("ScXTrs")
+# Директива strftime, в том числе с флагами %-d (Linux) и %#d (Windows)
+DIRECTIVE = re.compile(r"%[-#]?[A-Za-z%]")
+# Запас после границы секунды, чтобы таймер точно сработал уже в новой секунде
+TICK_MARGIN_MS = 2
+
+
+class ClockFormatter:
+    """Форматирование времени по TIME_FORMAT. Дата подставляется в шаблон один раз за сутки,
+    в каждом такте форматируется только время"""
+
+    def __init__(self, time_format):
+        self.time_format = time_format
+        self.directives = DIRECTIVE.findall(time_format)
+        self.has_seconds = any(d[-1] in SECOND_DIRECTIVES for d in self.directives)
+        self.day = None
+        self.template = time_format
+
+    def _render_date(self, match, now):
+        directive = match.group()
+        if directive[-1] not in DATE_DIRECTIVES:
+            return directive
+        return now.strftime(directive).replace("%", "%%")
+
+    def format(self, now):
+        """Строка часов для момента now (datetime)"""
+        day = now.date()
+        if day != self.day:  # новые сутки - пересобираем шаблон с готовой датой
+            self.day = day
+            self.template = DIRECTIVE.sub(lambda m: self._render_date(m, now), self.time_format)
+        return now.strftime(self.template)
+
+    def next_delay(self, now=None):
+        """Мс до следующей границы секунды (или минуты, если секунды не показываются)"""
+        now = time.time() if now is None else now
+        period = 1 if self.has_seconds else 60
+        return int((period - now % period) * 1000) + TICK_MARGIN_MS
+
+
+class Clock:
+    """Часы в Label: такты по границам секунд настенного времени (без накопления сдвига),
+    надпись меняется, только если изменился текст"""
+
+    def __init__(self, label, time_format):
+        self.label = label
+        self.formatter = ClockFormatter(time_format)
+        self.text = None
+
+    def set_format(self, time_format):
+        """Сменить формат (из настроек) и сразу перерисовать часы"""
+        if time_format != self.formatter.time_format:
+            self.formatter = ClockFormatter(time_format)
+            self.tick()
+
+    def next_delay(self):
+        return self.formatter.next_delay()
+
+    def tick(self):
+        text = self.formatter.format(datetime.now())
+        if text != self.text:
+            self.text = text
+            self.label.config(text=text)
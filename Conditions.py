@@ -0,0 +1,60 @@
+# Классификация погоды по числовому коду weatherapi (condition.code), не зависит от языка.
+# Вид осадков: None, "rain", "snow", "ice_pellets", "thunder"; интенсивность: 0 - нет, 1 - слабые, 2 - умеренные, 3 - сильные
+
+NO_PRECIPITATION = (None, 0)
+
+CONDITIONS = {
+    1000: NO_PRECIPITATION,     # Ясно / Солнечно
+    1003: NO_PRECIPITATION,     # Переменная облачность
+    1006: NO_PRECIPITATION,     # Облачно
+    1009: NO_PRECIPITATION,     # Пасмурно
+    1030: NO_PRECIPITATION,     # Дымка
+    1063: ("rain", 1),          # Местами дождь
+    1066: ("snow", 1),          # Местами снег
+    1069: ("snow", 1),          # Местами дождь со снегом
+    1072: ("rain", 1),          # Местами замерзающая морось
+    1087: ("thunder", 1),       # Местами грозы
+    1114: ("snow", 2),          # Поземок
+    1117: ("snow", 3),          # Метель
+    1135: NO_PRECIPITATION,     # Туман
+    1147: NO_PRECIPITATION,     # Переохлажденный туман
+    1150: ("rain", 1),          # Местами слабая морось
+    1153: ("rain", 1),          # Слабая морось
+    1168: ("rain", 1),          # Замерзающая морось
+    1171: ("rain", 2),          # Сильная замерзающая морось
+    1180: ("rain", 1),          # Местами небольшой дождь
+    1183: ("rain", 1),          # Небольшой дождь
+    1186: ("rain", 2),          # Временами умеренный дождь
+    1189: ("rain", 2),          # Умеренный дождь
+    1192: ("rain", 3),          # Временами сильный дождь
+    1195: ("rain", 3),          # Сильный дождь
+    1198: ("rain", 1),          # Слабый переохлажденный дождь
+    1201: ("rain", 2),          # Умеренный или сильный переохлажденный дождь
+    1204: ("snow", 1),          # Небольшой дождь со снегом
+    1207: ("snow", 2),          # Умеренный или сильный дождь со снегом
+    1210: ("snow", 1),          # Местами небольшой снег
+    1213: ("snow", 1),          # Небольшой снег
+    1216: ("snow", 2),          # Местами умеренный снег
+    1219: ("snow", 2),          # Умеренный снег
+    1222: ("snow", 3),          # Местами сильный снег
+    1225: ("snow", 3),          # Сильный снег
+    1237: ("ice_pellets", 2),   # Ледяной дождь
+    1240: ("rain", 1),          # Небольшой ливневый дождь
+    1243: ("rain", 2),          # Умеренный или сильный ливневый дождь
+    1246: ("rain", 3),          # Сильные ливни
+    1249: ("snow", 1),          # Небольшой ливневый дождь со снегом
+    1252: ("snow", 2),          # Умеренные или сильные ливневые дожди со снегом
+    1255: ("snow", 1),          # Небольшой снег
+    1258: ("snow", 2),          # Умеренный или сильный снег
+    1261: ("ice_pellets", 1),   # Небольшой ледяной дождь
+    1264: ("ice_pellets", 2),   # Умеренный или сильный ледяной дождь
+    1273: ("thunder", 1),       # В отдельных районах местами небольшой дождь с грозой
+    1276: ("thunder", 3),       # В отдельных районах умеренный или сильный дождь с грозой
+    1279: ("thunder", 1),       # В отдельных районах местами небольшой снег с грозой
+    1282: ("thunder", 3),       # В отдельных районах умеренный или сильный снег с грозой
+}
+
+
+def classify(code):
+    """(вид осадков, интенсивность) по коду погоды weatherapi"""
+    return CONDITIONS.get(code, NO_PRECIPITATION)
@@ -0,0 +1,96 @@
+import time
+import tkinter as tk
+
+FORECAST_HOURS = 6  # сколько ближайших часов показывать
+FORECAST_DAYS = 3   # и сколько дней (бесплатный ключ API отдаёт до 3 дней)
+
+WEEKDAYS = {
+    "ru": ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"],
+    "en": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+}
+
+
+def compact_forecast(answer):
+    """Из большого ответа forecast.json оставить только то, что показывает панель прогноза"""
+    hours = []
+    days = []
+    for day in answer["forecast"]["forecastday"]:
+        days.append({
+            "date_epoch": day["date_epoch"],
+            "max_c": day["day"]["maxtemp_c"],
+            "min_c": day["day"]["mintemp_c"],
+            "max_f": day["day"]["maxtemp_f"],
+            "min_f": day["day"]["mintemp_f"],
+            "code": day["day"]["condition"]["code"]
+        })
+        for hour in day["hour"]:
+            hours.append({
+                "time_epoch": hour["time_epoch"],
+                "temp_c": hour["temp_c"],
+                "temp_f": hour["temp_f"],
+                "code": hour["condition"]["code"]
+            })
+    return {"hours": hours, "days": days}
+
+
+def format_temp(temp_c, temp_f, temp_unit):
+    """+3° / -1° в выбранных единицах"""
+    temp = round(temp_c if temp_unit == "°C" else temp_f)
+    return f"{'+' if temp > 0 else ''}{temp}°"
+
+
+class ForecastPanel:
+    """Панель прогноза по часам и по дням. Ячейки создаются один раз,
+    при обновлении перерисовываются только те, текст которых изменился"""
+
+    def __init__(self, parent, theme, hours=FORECAST_HOURS, days=FORECAST_DAYS):
+        self.frame = theme.register(tk.Frame(parent), bg="bg")
+        self.hour_labels = self._row(theme, hours, 9)
+        self.day_labels = self._row(theme, days, 12)
+        self.texts = {}  # ячейка -> показанный текст
+        self.updated = 0  # сколько ячеек перерисовано при последнем обновлении
+
+    def _row(self, theme, count, width):
+        row = theme.register(tk.Frame(self.frame), bg="bg")
+        row.pack()
+        labels = []
+        for _ in range(count):
+            label = theme.register(tk.Label(row, text="", font=("Arial", 9), width=width), bg="bg", fg="fg")
+            label.pack(side="left")
+            labels.append(label)
+        return labels
+
+    def _set(self, label, text):
+        if self.texts.get(label) != text:
+            label.config(text=text)
+            self.texts[label] = text
+            self.updated += 1
+
+    def clear(self):
+        """Убрать прогноз (например, если для нового места его ещё нет)"""
+        for label in self.hour_labels + self.day_labels:
+            self._set(label, "")
+
+    def show(self, forecast, temp_unit, language, now=None):
+        """Показать прогноз (сжатый, см. compact_forecast) начиная с текущего часа"""
+        now = time.time() if now is None else now
+        self.updated = 0
+
+        hours = [hour for hour in forecast["hours"] if hour["time_epoch"] + 3600 > now]
+        for label, hour in zip(self.hour_labels, hours + [None] * len(self.hour_labels)):
+            if hour is None:
+                self._set(label, "")
+                continue
+            hour_text = time.strftime("%H:%M", time.localtime(hour["time_epoch"]))
+            self._set(label, f"{hour_text} {format_temp(hour['temp_c'], hour['temp_f'], temp_unit)}")
+
+        weekdays = WEEKDAYS.get(language, WEEKDAYS["en"])
+        days = forecast["days"]
+        for label, day in zip(self.day_labels, days + [None] * len(self.day_labels)):
+            if day is None:
+                self._set(label, "")
+                continue
+            weekday = weekdays[time.gmtime(day["date_epoch"]).tm_wday]  # date_epoch - полночь по UTC
+            self._set(label, f"{weekday} {format_temp(day['max_c'], day['max_f'], temp_unit)}"
+                             f"/{format_temp(day['min_c'], day['min_f'], temp_unit)}")
+        return self.updated
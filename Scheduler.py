@@ -0,0 +1,205 @@
+import sys
+import time
+import tkinter as tk
+
+# Поверхности, которым может требоваться видимость
+MAIN_WINDOW = "main"    # главное окно (или виджет)
+SNOW_OVERLAY = "overlay"  # снег на рабочем столе
+CLOCK_LABEL = "clock"   # часы в главном окне (в режиме виджета скрыты)
+CITY_LABEL = "city"     # название города в главном окне (в режиме виджета скрыто)
+
+# Как часто проверять блокировку сеанса, пока хоть что-то видно
+LOCK_CHECK_INTERVAL = 10000
+
+
+def session_locked():
+    """Заблокирован ли сеанс Windows (на других системах всегда False)"""
+    if sys.platform != "win32":
+        return False
+    import ctypes
+    user32 = ctypes.windll.user32
+    desktop = user32.OpenInputDesktop(0, False, 0x0100)  # DESKTOP_SWITCHDESKTOP
+    if not desktop:  # рабочий стол ввода недоступен - открыт экран блокировки
+        return True
+    user32.CloseDesktop(desktop)
+    return False
+
+
+class PeriodicTask:
+    """Периодическая задача на after(), которую можно полностью снять с расписания.
+    В расписании всегда стоит не больше одного запуска задачи"""
+
+    def __init__(self, manager, name, interval, callback, surface=None):
+        self.manager = manager
+        self.name = name
+        self.interval = interval  # мс или функция, возвращающая задержку до следующего запуска в мс
+        self.callback = callback
+        self.surface = surface  # какая поверхность (или кортеж поверхностей) должна быть видна (None - работает всегда)
+        self.after_id = None
+        self.due = None  # когда запланирован следующий запуск (time.monotonic)
+
+    @property
+    def running(self):
+        return self.after_id is not None
+
+    def delay(self):
+        """Задержка до следующего запуска, мс"""
+        return self.interval() if callable(self.interval) else self.interval
+    
+    def _schedule(self, delay):
+        self.due = time.monotonic() + delay / 1000
+        self.after_id = self.manager.root.after(delay, self._tick)
+
+    def start(self, run_now=False):
+        """Поставить задачу в расписание (если уже стоит - ничего не делает)"""
+        if self.running:
+            return
+        self._schedule(0 if run_now else self.delay())
+
+    def trigger(self):
+        """Выполнить задачу как можно скорее и отсчитывать интервал заново.
+        Несколько вызовов до запуска объединяются в один запуск"""
+        if self.running and self.due <= time.monotonic():
+            return  # запуск и так уже подошёл
+        self.stop()
+        self._schedule(0)
+
+    def stop(self):
+        """Снять задачу с расписания"""
+        if self.after_id is not None:
+            try:
+                self.manager.root.after_cancel(self.after_id)
+            except tk.TclError:
+                pass
+            self.after_id = None
+            self.due = None
+
+    def _tick(self):
+        self.manager.wakeups += 1
+        self._schedule(self.delay())
+        try:
+            self.callback()
+        except Exception as e:
+            print(f"Ошибка в задаче {self.name}: {e}")
+
+
+class LifecycleManager:
+    """Единое расписание всех периодических задач приложения.
+    Следит за видимостью главного окна и снега и за блокировкой сеанса.
+    Задачи, которым нужна видимая поверхность, полностью снимаются с расписания,
+    пока она скрыта, и запускаются сразу при её появлении.
+    Задачи и занятия именованные: повторное добавление с тем же именем заменяет прежнее"""
+
+    def __init__(self, root):
+        self.root = root
+        self.visible = {MAIN_WINDOW: True, SNOW_OVERLAY: False, CLOCK_LABEL: True, CITY_LABEL: True}
+        self.locked = False
+        self.tasks = {}  # имя -> PeriodicTask
+        self.activities = {}  # имя -> (поверхность, запуск, остановка, время до следующего кадра) - например, анимация снега
+        self.wakeups = 0
+        self.mark_time = time.monotonic()
+        self.mark_wakeups = 0
+        self.lock_task = PeriodicTask(self, "session_lock", LOCK_CHECK_INTERVAL, self._check_lock)
+        self._refresh()
+
+    def add_task(self, name, interval, callback, surface=None, run_now=True):
+        """Добавить периодическую задачу. surface - поверхность, без которой задача не нужна.
+        run_now=False - первый запуск через интервал (первый раз задачу уже выполнили отдельно)"""
+        self.cancel(name)
+        task = PeriodicTask(self, name, interval, callback, surface)
+        self.tasks[name] = task
+        if self.is_active(surface):
+            task.start(run_now=run_now)
+        return task
+
+    def add_activity(self, name, surface, resume, suspend, next_run=None):
+        """Добавить занятие со своим циклом (resume/suspend должны быть идемпотентными).
+        next_run() - секунд до следующего шага цикла или None (для списка задач)"""
+        self.activities[name] = (surface, resume, suspend, next_run)
+        self._refresh()
+
+    def cancel(self, name):
+        """Снять задачу с расписания и удалить её"""
+        task = self.tasks.pop(name, None)
+        if task is not None:
+            task.stop()
+
+    def trigger(self, name):
+        """Выполнить задачу вне очереди (если её поверхность сейчас видна)"""
+        task = self.tasks[name]
+        if self.is_active(task.surface):
+            task.trigger()
+
+    def jobs(self):
+        """Список запланированного: имя, поверхность, интервал и через сколько секунд следующий запуск"""
+        now = time.monotonic()
+        jobs = []
+        for task in [self.lock_task, *self.tasks.values()]:
+            jobs.append({
+                "name": task.name,
+                "surface": task.surface,
+                "interval": "динамический" if callable(task.interval) else task.interval,
+                "next_in": task.due - now if task.running else None
+            })
+        for name, (surface, resume, suspend, next_run) in self.activities.items():
+            jobs.append({
+                "name": name,
+                "surface": surface,
+                "interval": "цикл кадров",
+                "next_in": next_run() if next_run is not None else None
+            })
+        return jobs
+
+    def describe(self):
+        """Список задач в виде текста (для отладки)"""
+        lines = []
+        for job in self.jobs():
+            next_in = "не запланирована" if job["next_in"] is None else f"через {job['next_in']:.2f} с"
+            lines.append(f"{job['name']:<14} {str(job['surface']):<22} {str(job['interval']):<14} {next_in}")
+        return "\n".join(lines)
+
+    def is_active(self, surface):
+        if surface is None:
+            return True
+        surfaces = surface if isinstance(surface, tuple) else (surface,)
+        return all(self.visible[s] for s in surfaces) and not self.locked
+
+    def set_visible(self, surface, visible):
+        """Сообщить о показе или скрытии поверхности"""
+        if self.visible[surface] != visible:
+            self.visible[surface] = visible
+            print(f"{surface}: {'показано' if visible else 'скрыто'}")
+        self._refresh()
+
+    def mark(self):
+        """Начать новый замер пробуждений"""
+        self.mark_time = time.monotonic()
+        self.mark_wakeups = self.wakeups
+
+    def wakeups_per_minute(self):
+        """Пробуждений таймеров в минуту с момента mark()"""
+        minutes = (time.monotonic() - self.mark_time) / 60
+        return (self.wakeups - self.mark_wakeups) / minutes if minutes > 0 else 0.0
+
+    def _check_lock(self):
+        locked = session_locked()
+        if locked != self.locked:
+            self.locked = locked
+            print("Сеанс заблокирован" if locked else "Сеанс разблокирован")
+            self._refresh()
+
+    def _refresh(self):
+        # Блокировку проверяем, только пока хоть что-то видно (часы - часть главного окна)
+        if self.visible[MAIN_WINDOW] or self.visible[SNOW_OVERLAY]:
+            self.lock_task.start()
+        else:
+            self.lock_task.stop()
+            self.locked = False
+
+        for task in self.tasks.values():
+            if self.is_active(task.surface):
+                task.start(run_now=True)
+            else:
+                task.stop()
+        for surface, resume, suspend, next_run in self.activities.values():
+            resume() if self.is_active(surface) else suspend()
@@ -0,0 +1,132 @@
+import json
+import tkinter as tk
+from AppFiles import write_json_atomic
+
+# Версия схемы settings.json (сохраняется в файл под ключом SCHEMA_VERSION)
+SCHEMA_VERSION = 1
+# Задержка записи на диск: несколько изменений подряд сохраняются одной записью
+SAVE_DELAY = 500  # мс
+
+
+def _migrate_0(data):
+    """До версии 1 номер схемы в файле не хранился, набор ключей тот же"""
+    return data
+
+
+# Номер версии -> функция, переводящая настройки этой версии в следующую
+MIGRATIONS = {
+    0: _migrate_0
+}
+
+
+class SettingsStore:
+    """Настройки приложения в памяти: значения проверяются по типам значений по умолчанию,
+    подписчики узнают только об изменившихся ключах, запись на диск отложенная и атомарная"""
+
+    def __init__(self, path, defaults):
+        self.path = path
+        self.defaults = dict(defaults)
+        self.values = dict(defaults)
+        self.subscribers = []  # (ключи или None - все ключи, обработчик)
+        self.root = None
+        self.save_id = None
+
+    def load(self):
+        """Прочитать настройки с диска (с переходом со старых версий схемы)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict):
+            return
+
+        version = data.pop("SCHEMA_VERSION", 0)
+        for step in range(version, SCHEMA_VERSION):
+            data = MIGRATIONS[step](data)
+
+        for key, value in data.items():
+            if key in self.defaults:
+                self.values[key] = self._check(key, value)
+
+        if version < SCHEMA_VERSION:  # сразу сохраняем файл в новой схеме
+            self.save()
+
+    def _check(self, key, value):
+        """Значение нужного типа (тип берётся из значения по умолчанию) или значение по умолчанию"""
+        default = self.defaults[key]
+        if isinstance(default, bool):
+            valid = isinstance(value, bool)
+        elif isinstance(default, float):
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+            value = float(value) if valid else value
+        elif isinstance(default, int):
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, type(default))
+        if not valid:
+            print(f"Настройка {key}: недопустимое значение {value!r}, используется {default!r}")
+            return default
+        return value
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def attach(self, root):
+        """Привязать к главному окну Tkinter для отложенной записи на диск"""
+        self.root = root
+
+    def subscribe(self, keys, callback):
+        """Вызывать callback(изменения) при изменении любого из ключей (keys=None - любых).
+        Обработчик получает словарь {ключ: новое значение} только изменившихся ключей"""
+        self.subscribers.append((None if keys is None else set(keys), callback))
+
+    def update(self, changes):
+        """Изменить несколько настроек сразу. Каждый подписчик вызывается не больше одного раза.
+        Возвращает словарь действительно изменившихся значений"""
+        changed = {}
+        for key, value in changes.items():
+            value = self._check(key, value)
+            if self.values[key] != value:
+                self.values[key] = value
+                changed[key] = value
+        if not changed:
+            return changed
+
+        self.schedule_save()
+        for keys, callback in self.subscribers:
+            relevant = changed if keys is None else {key: changed[key] for key in changed.keys() & keys}
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    print(f"Ошибка применения настроек {', '.join(relevant)}: {e}")
+        return changed
+
+    def schedule_save(self):
+        """Сохранить на диск через SAVE_DELAY мс (без окна - сразу)"""
+        if self.root is None:
+            self.save()
+            return
+        if self.save_id is None:
+            self.save_id = self.root.after(SAVE_DELAY, self.save)
+
+    def save(self):
+        """Записать настройки на диск через временный файл"""
+        self.save_id = None
+        try:
+            write_json_atomic(self.path, {"SCHEMA_VERSION": SCHEMA_VERSION, **self.values})
+        except OSError as e:
+            print(f"Не удалось сохранить настройки: {e}")
+
+    def flush(self):
+        """Записать отложенные изменения сразу (при выходе из приложения)"""
+        if self.save_id is not None:
+            try:
+                self.root.after_cancel(self.save_id)
+            except tk.TclError:
+                pass
+            self.save()
@@ -1,12 +1,133 @@
 import tkinter as tk
 from tkinter import *
-import random
-import math
 import time
-import threading
+from PIL import Image, ImageTk
+from SnowPhysics import SnowSimulation, SnowRasterizer, FrameStats, SnowQualityController, DEFAULT_DENSITY
+
+# Во сколько раз больше снежинок при снегопаде данной силы (Conditions.classify)
+SNOW_INTENSITY_SCALE = {0: 1.0, 1: 1.0, 2: 1.5, 3: 2.0}
+
+
+class OvalSnowRenderer:
+    """Отрисовка снежинок овалами холста: один элемент на снежинку, в кадре только coords"""
+    
+    def __init__(self, canvas, simulation):
+        self.canvas = canvas
+        self.simulation = simulation
+        self.flake_ids = []
+        self.resize()
+    
+    def resize(self):
+        """Создать или удалить овалы под текущее число снежинок"""
+        count = self.simulation.count
+        while len(self.flake_ids) > count:
+            self.canvas.delete(self.flake_ids.pop())
+        for x1, y1, x2, y2 in self.simulation.bounding_boxes()[len(self.flake_ids):].tolist():
+            self.flake_ids.append(self.canvas.create_oval(
+                x1, y1, x2, y2,
+                fill='white',
+                outline='white',
+                tags='snow'
+            ))
+    
+    def draw(self):
+        coords = self.canvas.coords
+        for flake_id, box in zip(self.flake_ids, self.simulation.bounding_boxes().tolist()):
+            coords(flake_id, *box)
+
+
+class RasterSnowRenderer:
+    """Отрисовка всех снежинок одной картинкой на холсте, которая обновляется на месте.
+    Стоимость кадра почти не зависит от числа снежинок, в отличие от овалов"""
+    
+    def __init__(self, canvas, simulation):
+        self.canvas = canvas
+        self.rasterizer = SnowRasterizer(simulation)
+        self.photo = ImageTk.PhotoImage(Image.fromarray(self.rasterizer.buffer, mode='L'))
+        self.image_id = canvas.create_image(0, 0, image=self.photo, anchor='nw', tags='snow')
+    
+    def resize(self):
+        pass  # буфер не зависит от числа снежинок
+    
+    def draw(self):
+        self.photo.paste(Image.fromarray(self.rasterizer.rasterize(), mode='L'))
+
+
+# Способы отрисовки снега (настройка SNOW_BACKEND)
+SNOW_RENDERERS = {
+    "ovals": OvalSnowRenderer,
+    "raster": RasterSnowRenderer
+}
+
+
+class FrameScheduler:
+    """Цикл кадров на after() с гарантией единственного цикла.
+    Следующий кадр планируется от идеального времени (сдвиг не накапливается)"""
+    
+    def __init__(self, root, callback, fps=30, on_frame=None):
+        self.root = root
+        self.callback = callback
+        self.on_frame = on_frame  # вызывается со временем каждого кадра (в секундах)
+        self.fps = fps
+        self.active = False
+        self.after_id = None
+        self.next_deadline = 0
+        self.stats = FrameStats()
+    
+    def start(self):
+        """Запустить цикл (повторный вызов ничего не делает)"""
+        if self.active:
+            return
+        self.active = True
+        self.next_deadline = time.perf_counter()
+        self.after_id = self.root.after(0, self._tick)
+    
+    def stop(self):
+        """Остановить цикл"""
+        self.active = False
+        if self.after_id is not None:
+            try:
+                self.root.after_cancel(self.after_id)
+            except tk.TclError:
+                pass
+            self.after_id = None
+    
+    def next_run(self):
+        """Секунд до следующего кадра (None, если цикл остановлен)"""
+        if not self.active:
+            return None
+        return max(0.0, self.next_deadline - time.perf_counter())
+    
+    def set_fps(self, fps):
+        """Задать частоту кадров"""
+        self.fps = fps
+    
+    def _tick(self):
+        self.after_id = None
+        start = time.perf_counter()
+        try:
+            self.callback()
+        except tk.TclError:  # окно было закрыто
+            self.active = False
+            return
+        if not self.active:  # остановлен во время кадра
+            return
+        
+        now = time.perf_counter()
+        self.stats.add(start, now - start)
+        if self.on_frame is not None:
+            self.on_frame(now - start)
+        
+        # Следующий кадр - через ровно один период от предыдущего идеального момента
+        self.next_deadline += 1 / self.fps
+        if self.next_deadline < now:  # отстали больше чем на кадр - не пытаемся догнать
+            self.next_deadline = now
+        self.after_id = self.root.after(int((self.next_deadline - now) * 1000), self._tick)
+
 
 class SnowDesktopOverlay:
-    def __init__(self, parent_root=None):
+    def __init__(self, parent_root=None, snow_count=None, fps=30, backend="ovals",
+                 min_flakes=20, min_fps=10, cpu_budget=0.1):
         self.parent_root = parent_root
         
         if parent_root:
@@ -19,16 +140,21 @@ class SnowDesktopOverlay:
         # Настраиваем окно снега
         self.setup_window()
         
-        # Создаем снежинки
-        self.snowflakes = []
-        self.snow_count = 80
-        self.create_snowflakes()
+        # Создаем снежинки (по умолчанию - по площади экрана)
+        if snow_count is None:
+            snow_count = max(1, round(DEFAULT_DENSITY * self.screen_width * self.screen_height))
+        self.snow_count = snow_count
+        self.simulation = SnowSimulation(snow_count, self.screen_width, self.screen_height)
+        self.renderer = SNOW_RENDERERS.get(backend, OvalSnowRenderer)(self.canvas, self.simulation)
         
-        # Флаг для остановки анимации
-        self.running = True
+        # Флаг видимости снега
+        self.running = False
         
-        # Запускаем анимацию в отдельном потоке
-        self.animate()
+        # Качество снега подстраивается под бюджет процессорного времени
+        self.quality = SnowQualityController(snow_count, fps, min_flakes, min_fps, cpu_budget)
+        
+        # Единственный цикл анимации (запускается в show)
+        self.scheduler = FrameScheduler(self.root, self.animate, fps, on_frame=self.adjust_quality)
         
     def setup_window(self):
         """Настройка окна снега"""
@@ -58,80 +184,66 @@ class SnowDesktopOverlay:
             self.root.withdraw()
         
             
-    def create_snowflakes(self):
-        """Создание снежинок"""
-        for _ in range(self.snow_count):
-            flake = {
-                'x': random.randint(0, self.screen_width),
-                'y': random.randint(-100, 0),
-                'size': random.randint(1, 3),
-                'speed': random.uniform(0.5, 2),
-                'wind': random.uniform(-0.2, 0.2),
-                'oscillation': random.uniform(0.01, 0.05),
-                'offset': random.uniform(0, 6.28),
-                'id': None
-            }
-            self.snowflakes.append(flake)
+    def render_frame(self):
+        """Один кадр: шаг физики и отрисовка выбранным способом"""
+        self.simulation.step()
+        self.renderer.draw()
     
     def animate(self):
-        """Анимация снежинок"""
-        if not self.running:
-            return
-            
-        try:
-            # Очищаем холст
-            self.canvas.delete("snow")
-            
-            # Обновляем позиции снежинок
-            for flake in self.snowflakes:
-                # Движение вниз
-                flake['y'] += flake['speed']
-                
-                # Колебания вбок
-                oscillation = math.sin(time.time() * flake['oscillation'] + flake['offset']) * 0.5
-                flake['x'] += flake['wind'] + oscillation
-                
-                # Если снежинка упала, возвращаем наверх
-                if flake['y'] > self.screen_height:
-                    flake['y'] = random.randint(-100, -10)
-                    flake['x'] = random.randint(0, self.screen_width)
-                
-                # Рисуем снежинку
-                x1 = flake['x'] - flake['size']
-                y1 = flake['y'] - flake['size']
-                x2 = flake['x'] + flake['size']
-                y2 = flake['y'] + flake['size']
-                
-                # Создаем снежинку
-                flake['id'] = self.canvas.create_oval(
-                    x1, y1, x2, y2,
-                    fill='white',
-                    outline='white',
-                    tags='snow'
-                )
-            
-            # Обновляем окно
-            self.root.update_idletasks()
-            self.root.update()
-            
-            # Планируем следующее обновление
-            self.root.after(30, self.animate)
-            
-        except tk.TclError:
-            # Окно было закрыто
-            pass
+        """Кадр анимации снежинок (вызывается планировщиком кадров из главного цикла).
+        Только отрисовка: перерисовку окна Tkinter выполнит сам, без вложенного update()"""
+        self.render_frame()
+    
+    def adjust_quality(self, cost):
+        """Применить новый уровень качества, если контроллер его изменил"""
+        if self.quality.observe(cost):
+            self.apply_quality()
+    
+    def apply_quality(self):
+        """Перестроить снег под текущий уровень качества"""
+        level = self.quality.level()
+        if level["flakes"] != self.simulation.count:
+            self.simulation.resize(level["flakes"])
+            self.renderer.resize()
+        self.scheduler.set_fps(level["fps"])
+        print(f"Снег: {level['flakes']} снежинок, {level['fps']} к/с (нагрузка {level['load']:.1%})")
+    
+    def set_intensity(self, intensity):
+        """Густота снега по силе снегопада за окном (0 - снегопада нет, 3 - сильный).
+        Меняется только верхняя граница: бюджет процессора по-прежнему соблюдается"""
+        flakes = round(self.snow_count * SNOW_INTENSITY_SCALE.get(intensity, 1.0))
+        if self.quality.set_max_flakes(flakes):
+            self.apply_quality()
+    
+    def quality_level(self):
+        """Выбранный уровень качества: число снежинок, частота кадров, нагрузка"""
+        return self.quality.level()
+    
+    def frame_stats(self):
+        """Время отрисовки кадров (p50/p95/p99, мс) и доля времени главного потока"""
+        return self.scheduler.stats.summary()
     
     def show(self):
-        """Показать снег"""
+        """Показать снег (повторный вызов не запускает второй цикл анимации)"""
         self.running = True
         self.root.deiconify() if hasattr(self.root, 'deiconify') else self.root.wm_deiconify()
-        self.animate()
+        self.scheduler.start()
     
     def hide(self):
         """Скрыть снег"""
         self.running = False
+        self.scheduler.stop()
         self.root.withdraw() if hasattr(self.root, 'withdraw') else self.root.wm_withdraw()
     
+    def pause(self):
+        """Остановить анимацию, не скрывая окно (например, при блокировке сеанса)"""
+        self.scheduler.stop()
+    
+    def resume(self):
+        """Продолжить анимацию, если снег показан"""
+        if self.running:
+            self.scheduler.start()
+    
     def toggle(self):
         """Переключить видимость снега"""
         if self.running:
@@ -143,6 +255,7 @@ class SnowDesktopOverlay:
     def quit(self):
         """Завершить работу снега"""
         self.running = False
+        self.scheduler.stop()
         try:
             self.root.destroy()
         except:
@@ -156,4 +269,5 @@ class SnowDesktopOverlay:
 # Функция для тестирования
 if __name__ == "__main__":
     app = SnowDesktopOverlay()
+    app.show()
     app.run()
\ No newline at end of file
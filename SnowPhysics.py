@@ -0,0 +1,213 @@
+import math
+import time
+from collections import deque
+import numpy as np
+
+# Физика и растеризация снега без Tkinter: можно запускать без дисплея (см. bench_snow_headless.py)
+
+# Плотность снега по умолчанию: 80 снежинок на экран 1920x1080
+DEFAULT_DENSITY = 80 / (1920 * 1080)
+
+
+class SnowSimulation:
+    """Физика снежинок: состояние хранится массивами NumPy (структура массивов),
+    все снежинки обновляются за один векторный шаг"""
+    
+    FIELDS = ("x", "y", "size", "speed", "wind", "oscillation", "phase")
+    
+    def __init__(self, count, width, height, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        for field in self.FIELDS:
+            setattr(self, field, np.empty(0))
+        self.resize(count)
+    
+    def _spawn(self, count):
+        """Новые снежинки над экраном"""
+        return {
+            "x": self.rng.integers(0, self.width + 1, count).astype(np.float64),
+            "y": self.rng.integers(-100, 1, count).astype(np.float64),
+            "size": self.rng.integers(1, 4, count).astype(np.float64),
+            "speed": self.rng.uniform(0.5, 2, count),
+            "wind": self.rng.uniform(-0.2, 0.2, count),
+            "oscillation": self.rng.uniform(0.01, 0.05, count),
+            "phase": self.rng.uniform(0, 2 * math.pi, count)
+        }
+    
+    def resize(self, count):
+        """Изменить число снежинок: лишние убираются, новые появляются над экраном"""
+        if count > self.count:
+            new = self._spawn(count - self.count)
+            for field in self.FIELDS:
+                setattr(self, field, np.concatenate((getattr(self, field), new[field])))
+        elif count < self.count:
+            for field in self.FIELDS:
+                setattr(self, field, getattr(self, field)[:count].copy())
+        self.count = count
+        
+        # Буферы, переиспользуемые в каждом кадре (без выделения памяти в цикле)
+        self._drift = np.empty(count)
+        self._fallen = np.empty(count, dtype=bool)
+        self._boxes = np.empty((count, 4))
+    
+    def step(self, now=None):
+        """Сдвинуть все снежинки на один кадр"""
+        if now is None:
+            now = time.time()
+        
+        # Движение вниз
+        self.y += self.speed
+        
+        # Колебания вбок: wind + sin(now * oscillation + phase) * 0.5
+        drift = self._drift
+        np.multiply(self.oscillation, now, out=drift)
+        drift += self.phase
+        np.sin(drift, out=drift)
+        drift *= 0.5
+        drift += self.wind
+        self.x += drift
+        
+        # Упавшие снежинки возвращаем наверх в случайное место
+        fallen = np.flatnonzero(np.greater(self.y, self.height, out=self._fallen))
+        if fallen.size:
+            self.y[fallen] = self.rng.integers(-100, -10, fallen.size)
+            self.x[fallen] = self.rng.integers(0, self.width + 1, fallen.size)
+    
+    def bounding_boxes(self):
+        """Массив (count, 4) с координатами x1, y1, x2, y2 для каждой снежинки"""
+        boxes = self._boxes
+        np.subtract(self.x, self.size, out=boxes[:, 0])
+        np.subtract(self.y, self.size, out=boxes[:, 1])
+        np.add(self.x, self.size, out=boxes[:, 2])
+        np.add(self.y, self.size, out=boxes[:, 3])
+        return boxes
+
+
+class SnowRasterizer:
+    """Растеризация снежинок в буфер NumPy из заранее подготовленных спрайтов (без Tkinter).
+    Буфер в оттенках серого: чёрный фон окна снега прозрачен (-transparentcolor)"""
+    
+    MAX_SIZE = 3  # наибольший радиус снежинки
+    
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.width = simulation.width
+        self.height = simulation.height
+        
+        # Буфер с полями: снежинки за краем экрана прижимаются к полю и не видны,
+        # поэтому проверять границы для каждого пикселя не нужно
+        self.clip = self.MAX_SIZE + 1
+        self.pad = self.clip + self.MAX_SIZE
+        self.stride = self.width + 2 * self.pad
+        self.padded = np.zeros((self.height + 2 * self.pad, self.stride), dtype=np.uint8)
+        self.buffer = self.padded[self.pad:self.pad + self.height, self.pad:self.pad + self.width]
+        
+        # Спрайты снежинок: смещения пикселей круга в плоском буфере для каждого размера
+        self.sprites = {}
+        for size in range(1, self.MAX_SIZE + 1):
+            dy, dx = np.mgrid[-size:size + 1, -size:size + 1]
+            inside = dx * dx + dy * dy <= size * size + size  # как у овала того же размера
+            self.sprites[size] = dy[inside] * self.stride + dx[inside]
+    
+    def rasterize(self):
+        """Нарисовать все снежинки в буфер и вернуть его (без полей)"""
+        self.padded.fill(0)
+        flat = self.padded.reshape(-1)
+        sim = self.simulation
+        xs = np.clip(np.rint(sim.x), -self.clip, self.width - 1 + self.clip).astype(np.int64)
+        ys = np.clip(np.rint(sim.y), -self.clip, self.height - 1 + self.clip).astype(np.int64)
+        centers = (ys + self.pad) * self.stride + (xs + self.pad)
+        
+        for size, offsets in self.sprites.items():
+            # Все пиксели всех снежинок этого размера одним массивом (снежинки x пиксели спрайта)
+            flat[(centers[sim.size == size, None] + offsets).reshape(-1)] = 255
+        return self.buffer
+
+
+class FrameStats:
+    """Статистика времени отрисовки последних кадров"""
+    
+    def __init__(self, size=600):
+        self.samples = deque(maxlen=size)  # (момент начала кадра, длительность кадра) в секундах
+    
+    def add(self, start, cost):
+        self.samples.append((start, cost))
+    
+    def summary(self):
+        """p50/p95/p99 и среднее время кадра в мс и доля времени главного потока, занятая снегом"""
+        if not self.samples:
+            return None
+        costs = sorted(cost for _, cost in self.samples)
+        
+        def percentile(p):
+            return costs[min(len(costs) - 1, int(len(costs) * p))] * 1000
+        
+        first_start = self.samples[0][0]
+        last_start, last_cost = self.samples[-1]
+        elapsed = last_start + last_cost - first_start
+        return {
+            "frames": len(costs),
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "mean": sum(costs) / len(costs) * 1000,
+            "share": sum(costs) / elapsed if elapsed > 0 else 0.0
+        }
+
+
+class SnowQualityController:
+    """Подбор числа снежинок и частоты кадров под бюджет процессорного времени.
+    Нагрузка = среднее время кадра x частота кадров (доля времени главного потока).
+    При перегрузке сначала уменьшается число снежинок, затем частота кадров;
+    при запасе сначала возвращается частота кадров, затем снежинки"""
+    
+    WINDOW = 30          # кадров в одном замере
+    HEADROOM = 0.6       # нагрузка ниже 60% бюджета - можно повышать качество
+    FPS_STEP = 5
+    
+    def __init__(self, flakes, fps, min_flakes=20, min_fps=10, cpu_budget=0.1):
+        self.max_flakes = flakes
+        self.max_fps = fps
+        self.min_flakes = min(min_flakes, flakes)
+        self.min_fps = min(min_fps, fps)
+        self.cpu_budget = cpu_budget
+        self.flakes = flakes
+        self.fps = fps
+        self.load = 0.0
+        self.costs = []
+    
+    def observe(self, cost):
+        """Учесть время кадра (с). Возвращает True, если уровень качества изменился"""
+        self.costs.append(cost)
+        if len(self.costs) < self.WINDOW:
+            return False
+        self.load = sum(self.costs) / len(self.costs) * self.fps
+        self.costs = []
+        
+        flakes, fps = self.flakes, self.fps
+        if self.load > self.cpu_budget:
+            if self.flakes > self.min_flakes:
+                # Время кадра примерно пропорционально числу снежинок
+                self.flakes = max(self.min_flakes, int(self.flakes * self.cpu_budget / self.load * 0.9))
+            else:
+                self.fps = max(self.min_fps, self.fps - self.FPS_STEP)
+        elif self.load < self.cpu_budget * self.HEADROOM:
+            if self.fps < self.max_fps:
+                self.fps = min(self.max_fps, self.fps + self.FPS_STEP)
+            elif self.flakes < self.max_flakes:
+                self.flakes = min(self.max_flakes, int(self.flakes * 1.25) + 1)
+        return (flakes, fps) != (self.flakes, self.fps)
+    
+    def set_max_flakes(self, flakes):
+        """Изменить верхнюю границу числа снежинок. Возвращает True, если уровень качества изменился"""
+        self.max_flakes = max(self.min_flakes, flakes)
+        if self.flakes > self.max_flakes:
+            self.flakes = self.max_flakes
+            return True
+        return False
+    
+    def level(self):
+        """Текущий уровень качества"""
+        return {"flakes": self.flakes, "fps": self.fps, "load": self.load}
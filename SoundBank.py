@@ -0,0 +1,61 @@
+from pygame import mixer
+
+# Длительность плавного перехода между звуками погоды, мс
+CROSSFADE_MS = 2000
+
+
+class SoundBank:
+    """Звуки погоды: каждый файл декодируется один раз и остаётся в памяти.
+    Воспроизведение меняется, только когда меняется вид осадков, с плавным переходом"""
+
+    def __init__(self, files, volume=0.5, crossfade_ms=CROSSFADE_MS):
+        self.files = files  # вид осадков -> путь к звуковому файлу
+        self.volume = volume
+        self.crossfade_ms = crossfade_ms
+        self.sounds = {}  # вид осадков -> mixer.Sound (уже декодированный)
+        self.current_kind = None
+
+    def _sound(self, kind):
+        """Декодированный звук для вида осадков (файл читается только один раз)"""
+        if kind not in self.sounds:
+            self.sounds[kind] = mixer.Sound(self.files[kind])
+        return self.sounds[kind]
+
+    def preload(self):
+        """Заранее декодировать все звуки"""
+        for kind in self.files:
+            try:
+                self._sound(kind)
+            except Exception as e:
+                print(f"Ошибка загрузки звука {self.files[kind]}: {e}")
+
+    def play(self, kind):
+        """Включить звук для вида осадков (None - тишина). Тот же вид не перезапускается"""
+        if kind == self.current_kind:
+            return
+
+        if self.current_kind is not None:
+            self.sounds[self.current_kind].fadeout(self.crossfade_ms)  # старый звук плавно затихает
+        self.current_kind = None
+
+        if kind is not None:
+            sound = self._sound(kind)
+            sound.set_volume(self.volume)
+            sound.play(loops=-1, fade_ms=self.crossfade_ms)  # новый плавно нарастает
+            self.current_kind = kind
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.current_kind is not None:
+            self.sounds[self.current_kind].set_volume(volume)
+
+    def stop(self):
+        if self.current_kind is not None:
+            self.sounds[self.current_kind].stop()
+            self.current_kind = None
+
+    def quit(self):
+        """Остановить звук и микшер (при выходе из приложения)"""
+        self.stop()
+        self.sounds.clear()
+        mixer.quit()
@@ -0,0 +1,72 @@
+import time
+import tkinter as tk
+
+
+class ThemeManager:
+    """Тема оформления. Виджеты регистрируются со списком свойств, которые берутся из цветов темы
+    (например, bg="bg", activebackground="button_active"). При смене темы меняются только свойства,
+    значение которых действительно отличается от уже применённого"""
+
+    def __init__(self, themes, name):
+        self.themes = themes
+        self.name = name
+        self.colors = themes[name]
+        self.widgets = {}  # виджет -> {свойство: ключ цвета темы}
+        self.applied = {}  # виджет -> {свойство: применённый цвет}
+        self.listeners = []  # обработчики смены темы для того, что не является виджетом (стили ttk)
+        self.last_switch = None  # (время смены, мс; изменено свойств)
+
+    def register(self, widget, **properties):
+        """Оформлять виджет по теме. Возвращает сам виджет"""
+        self.widgets[widget] = properties
+        self.applied[widget] = {prop: str(widget.cget(prop)) for prop in properties}
+        self._apply(widget)
+        # Закрытый виджет (в том числе вместе с окном настроек) больше не перекрашиваем
+        widget.bind("<Destroy>", lambda event: self._forget(widget) if event.widget is widget else None, add="+")
+        return widget
+
+    def add_listener(self, callback):
+        """Вызывать callback(цвета) сейчас и при каждой смене темы"""
+        self.listeners.append(callback)
+        callback(self.colors)
+
+    def add_hover(self, widget, key="button_active"):
+        """Подсветка виджета при наведении цветом key текущей темы"""
+        widget.bind("<Enter>", lambda event: widget.configure(bg=self.colors[key]), add="+")
+        widget.bind("<Leave>", lambda event: widget.configure(bg=self.applied[widget]["bg"]), add="+")
+
+    def _forget(self, widget):
+        self.widgets.pop(widget, None)
+        self.applied.pop(widget, None)
+
+    def _apply(self, widget):
+        """Применить к виджету отличающиеся свойства. Возвращает число изменённых свойств"""
+        applied = self.applied[widget]
+        changes = {prop: self.colors[key] for prop, key in self.widgets[widget].items()
+                   if applied[prop] != self.colors[key]}
+        if changes:
+            widget.configure(**changes)
+            applied.update(changes)
+        return len(changes)
+
+    def set_theme(self, name):
+        """Сменить тему. Возвращает False, если она уже применена"""
+        if name == self.name:
+            return False
+        start = time.perf_counter()
+        self.name = name
+        self.colors = self.themes[name]
+
+        changed = 0
+        for widget in list(self.widgets):
+            try:
+                changed += self._apply(widget)
+            except tk.TclError:  # виджет уже закрыт
+                self._forget(widget)
+        for callback in self.listeners:
+            callback(self.colors)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.last_switch = (elapsed, changed)
+        print(f"Тема {name}: изменено свойств {changed} у {len(self.widgets)} виджетов за {elapsed:.2f} мс")
+        return True
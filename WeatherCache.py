@@ -0,0 +1,266 @@
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from AppFiles import app_data_dir, write_json_atomic
+
+# weatherapi обновляет текущие условия примерно раз в 15 минут
+UPSTREAM_UPDATE_INTERVAL = 15 * 60
+# Если обновление на сервере запаздывает, проверяем не чаще раза в минуту
+RECHECK_INTERVAL = 60
+# Местоположение по IP перепроверяем раз в сутки, даже если сеть не менялась
+LOCATION_TTL = 24 * 60 * 60
+# Сколько декодированных иконок держать в памяти
+ICON_MEMORY_SIZE = 16
+# Прогноз меняется медленно, а ответ forecast.json большой - запрашиваем его раз в час
+FORECAST_TTL = 60 * 60
+
+
+def load_snapshot(path):
+    """Прочитать последние сохранённые данные о погоде (None, если их нет)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_snapshot(path, weather):
+    """Сохранить последние полученные данные о погоде"""
+    try:
+        write_json_atomic(path, weather)
+    except OSError as e:
+        print(f"Не удалось сохранить данные о погоде: {e}")
+
+
+class WeatherCache:
+    """Кэш ответов weatherapi по ключу (местоположение, язык).
+    Запись считается свежей, пока на сервере не могло появиться новое наблюдение:
+    до current.last_updated_epoch + интервал обновления сервера"""
+
+    def __init__(self, update_interval=UPSTREAM_UPDATE_INTERVAL, recheck_interval=RECHECK_INTERVAL):
+        self.update_interval = update_interval
+        self.recheck_interval = recheck_interval
+        self.entries = {}  # ключ -> (ответ API, время загрузки, время следующей проверки)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Вернуть сохранённый ответ, если он ещё актуален, иначе None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() < entry[2]:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, payload):
+        """Сохранить ответ API (current.json)"""
+        fetched_at = time.time()
+        last_updated = payload["current"].get("last_updated_epoch", fetched_at)
+        # Часы сервера и компьютера могут расходиться - наблюдение не может быть новее загрузки
+        last_updated = min(last_updated, fetched_at)
+        next_check = max(last_updated + self.update_interval, fetched_at + self.recheck_interval)
+        with self.lock:
+            self.entries[key] = (payload, fetched_at, next_check)
+
+    def invalidate(self, key=None):
+        """Сбросить одну запись или весь кэш"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+
+class ForecastCache:
+    """Прогноз погоды по местоположению со своим сроком жизни (FORECAST_TTL).
+    Хранится на диске (forecast.json), поэтому после перезапуска прогноз не запрашивается заново"""
+
+    def __init__(self, path=None, ttl=FORECAST_TTL):
+        self.path = path or os.path.join(app_data_dir(), "forecast.json")
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}  # местоположение -> {"fetched_at": время загрузки, "forecast": прогноз}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries.update(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def get(self, key):
+        """Сохранённый прогноз, если он ещё не устарел, иначе None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+                return entry["forecast"]
+            return None
+
+    def put(self, key, forecast):
+        now = time.time()
+        with self.lock:
+            # Устаревшие прогнозы для других мест не храним
+            self.entries = {k: entry for k, entry in self.entries.items() if now - entry["fetched_at"] < self.ttl}
+            self.entries[key] = {"fetched_at": now, "forecast": forecast}
+            try:
+                write_json_atomic(self.path, self.entries)
+            except OSError as e:
+                print(f"Не удалось сохранить прогноз: {e}")
+
+
+class LocationResolver:
+    """Определение местоположения по IP с сохранением на диск.
+    Внешний IP запрашивается только при смене сети или по истечении LOCATION_TTL,
+    а для известного IP погода запрашивается сразу по координатам"""
+
+    IP_URL = "https://ifconfig.me/ip"
+
+    def __init__(self, http_client, path=None, ttl=LOCATION_TTL):
+        self.http_client = http_client
+        self.path = path or os.path.join(app_data_dir(), "location.json")
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.data = {"network": None, "ip": None, "checked_at": 0, "places": {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data.update(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    @staticmethod
+    def network_id():
+        """Локальный адрес исходящего интерфейса - меняется при смене сети (пакеты не отправляются)"""
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                return s.getsockname()[0]
+        except OSError:
+            return None
+
+    def resolve(self):
+        """Вернуть (ip, запрос для API, название города или None, если город ещё не известен)"""
+        network = self.network_id()
+        now = time.time()
+
+        with self.lock:
+            place = self.data["places"].get(self.data["ip"] or "")
+            same_network = network is None or network == self.data["network"]
+            if place and same_network and now - self.data["checked_at"] < self.ttl:
+                return self.data["ip"], place["query"], place["name"]
+
+        ip = self.http_client.get_text(self.IP_URL)  # сеть сменилась или данные устарели
+
+        with self.lock:
+            self.data.update(network=network, ip=ip, checked_at=now)
+            self._save()
+            place = self.data["places"].get(ip)
+            if place and now - place["saved_at"] < self.ttl:
+                return ip, place["query"], place["name"]
+        return ip, ip, None
+
+    def remember(self, ip, location):
+        """Запомнить город для IP по блоку location из ответа weatherapi"""
+        with self.lock:
+            self.data["places"][ip] = {
+                "query": f"{location['lat']},{location['lon']}",
+                "name": location["name"],
+                "saved_at": time.time()
+            }
+            self._save()
+
+    def cached_name(self):
+        """Название последнего определённого города (без обращения к сети)"""
+        with self.lock:
+            place = self.data["places"].get(self.data["ip"] or "")
+            return place["name"] if place else None
+
+    def _save(self):
+        try:
+            write_json_atomic(self.path, self.data)
+        except OSError as e:
+            print(f"Не удалось сохранить местоположение: {e}")
+
+
+class IconStore:
+    """Двухуровневое хранилище иконок погоды: файлы на диске (по пути вида day/113.png)
+    и ограниченный LRU-кэш уже декодированных PhotoImage в памяти"""
+
+    def __init__(self, http_client, path=None, max_images=ICON_MEMORY_SIZE):
+        self.http_client = http_client
+        self.path = path or os.path.join(app_data_dir(), "icons")
+        self.max_images = max_images
+        self.images = OrderedDict()  # путь иконки -> PhotoImage (только из главного потока)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def icon_key(icon_url):
+        """//cdn.weatherapi.com/weather/64x64/day/113.png -> day/113.png"""
+        return "/".join(icon_url.rstrip("/").split("/")[-2:])
+
+    def _file_path(self, key):
+        return os.path.join(self.path, *key.split("/"))
+
+    def fetch(self, icon_url):
+        """Получить (путь иконки, байты PNG) - с диска или из сети. Вызывается в фоновом потоке.
+        Если иконка уже декодирована в памяти, байты не читаются (None)"""
+        key = self.icon_key(icon_url)
+        with self.lock:
+            if key in self.images:
+                return key, None
+
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, 'rb') as f:
+                return key, f.read()
+        except OSError:
+            pass
+
+        data = self.http_client.get_bytes("https:" + icon_url if icon_url.startswith("//") else icon_url)
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path + ".tmp", 'wb') as f:
+                f.write(data)
+            os.replace(file_path + ".tmp", file_path)
+        except OSError as e:
+            print(f"Не удалось сохранить иконку {key}: {e}")
+        return key, data
+
+    def cached(self, icon_url):
+        """(путь иконки, байты PNG) без обращения к сети или None, если иконки ещё нет"""
+        key = self.icon_key(icon_url)
+        with self.lock:
+            if key in self.images:
+                return key, None
+        try:
+            with open(self._file_path(key), 'rb') as f:
+                return key, f.read()
+        except OSError:
+            return None
+
+    def photo(self, key, data=None):
+        """PhotoImage для иконки (в главном потоке Tkinter). Повторная иконка не декодируется заново"""
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+                return image
+
+        if data is None:  # иконку успели вытеснить из памяти - читаем с диска
+            with open(self._file_path(key), 'rb') as f:
+                data = f.read()
+        from PIL import ImageTk  # PIL загружается с первой иконкой, а не при запуске
+        image = ImageTk.PhotoImage(data=data)
+
+        with self.lock:
+            self.images[key] = image
+            while len(self.images) > self.max_images:
+                self.images.popitem(last=False)
+        return image
@@ -0,0 +1,310 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from concurrent.futures import Future
+
+# Коды ответа, при которых запрос имеет смысл повторить
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Текущая погода weatherapi
+CURRENT_URL = "https://api.weatherapi.com/v1/current.json"
+# Коды ошибок weatherapi, означающие, что пакетные запросы недоступны для ключа API (тариф)
+BULK_DENIED_CODES = (2009,)
+# Прогноз по часам и по дням
+FORECAST_URL = "https://api.weatherapi.com/v1/forecast.json"
+
+
+class HttpClient:
+    """Общий HTTP-клиент: постоянные соединения, таймауты и повторы с нарастающей задержкой.
+    requests загружается при первом запросе (в фоновом потоке), а не при запуске приложения"""
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10, retries=2, backoff=0.5, backoff_max=4.0, pool_size=4):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.session = None
+        self.lock = threading.Lock()
+
+    def _session(self):
+        """Одна сессия на всё приложение: соединения (и TLS) переиспользуются между запросами"""
+        with self.lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.session = session
+            return self.session
+
+    def get(self, url, params=None, retries=None):
+        """GET-запрос с таймаутами и повторами. Возвращает requests.Response"""
+        return self.request("GET", url, params, retries)
+
+    def request(self, method, url, params=None, retries=None, json=None):
+        """Запрос с таймаутами и повторами. Возвращает requests.Response"""
+        import requests
+        session = self._session()
+        attempts = (self.retries if retries is None else retries) + 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = session.request(method, url, params=params, json=json, timeout=(self.connect_timeout, self.read_timeout))
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+            # Экспоненциальная задержка перед повтором, но не больше backoff_max
+            time.sleep(min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    def get_json(self, url, params=None, retries=None):
+        return self.get(url, params, retries).json()
+
+    def post_json(self, url, params=None, data=None, retries=None):
+        """POST с телом в JSON. Возвращает requests.Response"""
+        return self.request("POST", url, params, retries, json=data)
+
+    def get_text(self, url, params=None, retries=None):
+        response = self.get(url, params, retries)
+        response.raise_for_status()
+        return response.text.strip()
+
+    def get_bytes(self, url, params=None, retries=None):
+        response = self.get(url, params, retries)
+        response.raise_for_status()
+        return response.content
+
+    def preconnect(self, url):
+        """Заранее открыть соединение с сервером (TCP + TLS), чтобы следующий запрос к нему
+        не ждал установки соединения. Ошибки не важны - запрос просто откроет соединение сам"""
+        try:
+            self._session().head(url, timeout=(self.connect_timeout, self.read_timeout)).close()
+        except Exception as e:
+            print(f"Не удалось заранее подключиться к {url}: {e}")
+
+    def close(self):
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+
+
+class DaemonExecutor:
+    """Пул фоновых потоков с submit/shutdown, как у ThreadPoolExecutor, но из потоков-демонов.
+    Потоки ThreadPoolExecutor интерпретатор дожидается при выходе, и зависший запрос держал бы
+    процесс живым после закрытия окна; потоки-демоны завершаются вместе с приложением"""
+
+    def __init__(self, max_workers, thread_name_prefix):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self.queue = queue.SimpleQueue()  # (Future, функция, аргументы); None - сигнал потоку завершиться
+        self.threads = []
+        self.idle = threading.Semaphore(0)  # сколько потоков ждут работу
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args):
+        """Выполнить func(*args) в фоне. Возвращает Future; RuntimeError - если пул уже остановлен"""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("пул потоков остановлен")
+            future = Future()
+            self.queue.put((future, func, args))
+            # Новый поток - только если все заняты и предел ещё не достигнут
+            if not self.idle.acquire(blocking=False) and len(self.threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, name=f"{self.thread_name_prefix}_{len(self.threads)}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+            return future
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            future, func, args = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(func(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            self.idle.release()
+
+    def shutdown(self):
+        """Отменить ещё не начатые задачи и отпустить потоки, не дожидаясь выполняемых"""
+        with self.lock:
+            self.closed = True
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+            for _ in self.threads:
+                self.queue.put(None)
+
+
+class FetchWorker:
+    """Фоновая загрузка данных: сеть в пуле потоков, результат - в главный поток Tkinter"""
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self.executor = DaemonExecutor(max_workers, "WinWeatherFetch")
+        self.in_flight = {}  # ключ запроса -> список обработчиков, ожидающих результат
+        self.lock = threading.Lock()
+
+    def submit(self, key, func, callback, *args):
+        """Запустить func(*args) в фоне и передать результат в callback в потоке Tkinter.
+        Если запрос с таким ключом уже выполняется, новый не создаётся - callback
+        просто получит результат текущего. Возвращает True, если запрос был запущен"""
+        with self.lock:
+            if key in self.in_flight:
+                self.in_flight[key].append(callback)
+                return False
+            self.in_flight[key] = [callback]
+
+        try:
+            future = self.executor.submit(func, *args)
+        except RuntimeError:  # пул уже остановлен (выход из приложения)
+            with self.lock:
+                self.in_flight.pop(key, None)
+            return False
+
+        future.add_done_callback(lambda f: self._on_done(key, f))
+        return True
+
+    def is_pending(self, key):
+        """Выполняется ли сейчас запрос с данным ключом"""
+        with self.lock:
+            return key in self.in_flight
+
+    def _on_done(self, key, future):
+        """Вызывается в рабочем потоке по завершении запроса"""
+        with self.lock:
+            callbacks = self.in_flight.pop(key, [])
+
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Ошибка фоновой загрузки ({key}): {e}")
+            return
+
+        try:
+            # Передаём результат в главный поток Tkinter
+            self.root.after(0, lambda: self._deliver(callbacks, result))
+        except (RuntimeError, tk.TclError):
+            pass  # главное окно уже закрыто
+
+    def _deliver(self, callbacks, result):
+        """Вызов обработчиков в главном потоке Tkinter"""
+        for callback in callbacks:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"Ошибка обработки результата загрузки: {e}")
+
+    def shutdown(self):
+        """Остановить пул потоков, не дожидаясь зависших запросов"""
+        self.executor.shutdown()
+
+
+class WeatherFetcher:
+    """Текущая погода для нескольких мест за один цикл обновления.
+    Свежие ответы берутся из кэша, остальные - одним пакетным запросом (q=bulk),
+    а если тариф его не поддерживает - параллельными запросами, не больше max_workers одновременно"""
+
+    def __init__(self, http_client, cache, api_key, max_workers=4):
+        self.http_client = http_client
+        self.cache = cache
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.bulk_supported = True  # выясняется при первом пакетном запросе
+        self.executor = None  # создаётся при первом параллельном запросе
+
+    def fetch(self, queries, lang):
+        """Ответы API по каждому запросу: {запрос: ответ}. Не полученных мест в словаре нет,
+        ответ с ошибкой API (без "current") возвращается как есть и не кэшируется"""
+        results = {}
+        missing = []
+        for query in dict.fromkeys(queries):  # без повторов, порядок сохраняется
+            payload = self.cache.get((query, lang))
+            if payload is not None:
+                results[query] = payload
+            else:
+                missing.append(query)
+
+        fetched = None
+        if len(missing) > 1 and self.bulk_supported:
+            fetched = self._fetch_bulk(missing, lang)
+        if fetched is None:
+            fetched = self._fetch_each(missing, lang)
+
+        for query, payload in fetched.items():
+            if "current" in payload:  # ошибки API не кэшируем
+                self.cache.put((query, lang), payload)
+            results[query] = payload
+        return results
+
+    def _params(self, query, lang):
+        return {"key": self.api_key, "q": query, "aqi": "yes", "lang": lang}
+
+    def _fetch_bulk(self, queries, lang):
+        """Все места одним запросом. None, если пакетный запрос не удался - тогда места
+        запрашиваются по одному. Отключаются пакетные запросы только по явному отказу API"""
+        import requests
+        body = {"locations": [{"q": query, "custom_id": str(i)} for i, query in enumerate(queries)]}
+        try:
+            response = self.http_client.post_json(CURRENT_URL, self._params("bulk", lang), body)
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:  # нет связи или ответ не JSON (например, страница 502)
+            print(f"Пакетный запрос погоды не удался ({e}), в этот раз - по одному месту")
+            return None
+
+        if response.status_code != 200 or not isinstance(data, dict) or "bulk" not in data:
+            error = data.get("error", {}) if isinstance(data, dict) else {}
+            if error.get("code") in BULK_DENIED_CODES:
+                print(f"Пакетный запрос погоды недоступен ({error.get('message')}), дальше - параллельные запросы")
+                self.bulk_supported = False
+            else:  # временная ошибка сервера - в следующий раз пробуем снова
+                print(f"Пакетный запрос погоды не удался ({error.get('message', response.status_code)}), "
+                      f"в этот раз - по одному месту")
+            return None
+
+        results = {}
+        for item in data["bulk"]:
+            answer = item.get("query", {})
+            if "custom_id" not in answer:
+                continue
+            query = queries[int(answer["custom_id"])]
+            if "current" in answer:
+                results[query] = {"location": answer["location"], "current": answer["current"]}
+            else:
+                results[query] = {"error": answer.get("error")}
+        return results
+
+    def _fetch_each(self, queries, lang):
+        """По запросу на место; несколько мест - параллельно"""
+        if len(queries) == 1:
+            return {queries[0]: self.http_client.get_json(CURRENT_URL, self._params(queries[0], lang))}
+
+        if self.executor is None:
+            self.executor = DaemonExecutor(self.max_workers, "WinWeatherCity")
+        futures = {query: self.executor.submit(self.http_client.get_json, CURRENT_URL, self._params(query, lang))
+                   for query in queries}
+        results = {}
+        for query, future in futures.items():
+            try:
+                results[query] = future.result()
+            except Exception as e:
+                print(f"Ошибка получения погоды для {query}: {e}")
+        return results
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
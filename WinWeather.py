@@ -7,20 +7,28 @@
 # Обновлено: 10.12.2025  
 # ==============================================================================================
 
+import time
+START_TIME = time.perf_counter()  # для замера времени запуска
+
 import threading
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
-import requests
-from urllib.request import  Request, urlopen
-from PIL import Image, ImageTk
-import json
 import sys
 import os
-import pygame  # для работы со звуком
-from pygame import mixer
-import pystray
-from SnowOnDesktop import SnowDesktopOverlay
+# pygame, pystray, requests, PIL и снег (numpy) загружаются при первом использовании
+from WeatherClient import FetchWorker, HttpClient, WeatherFetcher, FORECAST_URL
+from Scheduler import LifecycleManager, MAIN_WINDOW, SNOW_OVERLAY, CLOCK_LABEL, CITY_LABEL
+from Clock import Clock
+from Settings import SettingsStore
+from Assets import AssetCache, dpi_scale
+from Theme import ThemeManager
+from Conditions import classify
+from WeatherCache import WeatherCache, ForecastCache, LocationResolver, IconStore, load_snapshot, save_snapshot
+from Forecast import ForecastPanel, compact_forecast, FORECAST_DAYS
+
+IMPORT_TIME = time.perf_counter() - START_TIME
+STARTUP_BENCHMARK = "--startup-benchmark" in sys.argv  # замер запуска: выход сразу после появления окна
 
 snow_overlay = None  # Глобальная переменная для снега
 systray_icon = None
@@ -28,10 +36,18 @@ APP_IN_TRAY = False
 
 WIDTH = 400
 HEIGHT = 320
+FORECAST_HEIGHT = 40  # панель прогноза под основными данными (только в главном окне)
 
 W_WIDTH  = 250
 W_HEIGHT = 100
 
+SNAPSHOT_PATH = 'last_weather.json'  # последние полученные данные о погоде (рядом с settings.json)
+CITY_CYCLE_INTERVAL = 10000  # как часто переключаться между городами (если их несколько), мс
+FORECAST_INTERVAL = 10 * 60 * 1000  # как часто сдвигать прогноз по часам, мс (сам прогноз запрашивается раз в FORECAST_TTL)
+SPLASH_TIMEOUT = 3000  # дольше заставка первую погоду не ждёт, мс
+# Серверы, соединения с которыми открываются заранее, пока определяется местоположение
+PRECONNECT_URLS = ["https://api.weatherapi.com/", "https://cdn.weatherapi.com/"]
+
 VERSION = "1.1.4"
 ABOUT = f"2025, Vladislav Banitsky, v. {VERSION}"
 
@@ -39,6 +55,7 @@ ABOUT = f"2025, Vladislav Banitsky, v. {VERSION}"
 DEFAULT_SETTINGS = {
     "API_WEATHER_KEY": "c866db0d4955404eb89124646253007",
     "CITY": "Санкт-Петербург",
+    "CITIES": [],
     "TEMP_UNIT": "°C",
     "TIME_FORMAT": "%H:%M:%S    %d.%m.%Y",
     "LANGUAGE": "ru",
@@ -46,7 +63,12 @@ DEFAULT_SETTINGS = {
     "VOLUME": 0.5,
     "WIDGET_ALWAYS_ON_TOP": False,
     "AUTO_DETECT_SETTINGS": True,
-    "SNOW_IS_ON": True
+    "SNOW_IS_ON": True,
+    "SNOW_FPS": 30,
+    "SNOW_BACKEND": "ovals",
+    "SNOW_MIN_FPS": 10,
+    "SNOW_MIN_FLAKES": 20,
+    "SNOW_CPU_BUDGET": 0.1
 }
 
 # Цветовые схемы для тем
@@ -72,6 +94,9 @@ def create_systray_icon():
     global systray_icon, APP_IN_TRAY
     
     try:
+        import pystray
+        from PIL import Image
+        
         # Загружаем иконку для трея
         icon_image = Image.open(resource_path('./resources/images/WinWeather.ico'))
         
@@ -113,12 +138,14 @@ def minimize_to_tray():
     global APP_IN_TRAY
     
     try:
-        # Скрываем главное окно
+        # Скрываем главное окно (его таймеры снимаются с расписания)
         root.withdraw()
+        lifecycle.set_visible(MAIN_WINDOW, False)
+        lifecycle.mark()  # замер пробуждений в трее
         
         # Показываем снег, если он включен
         if SNOW_IS_ON and snow_overlay is not None:
-            snow_overlay.show()
+            show_snow()
         
         # Создаем иконку в трее, если еще не создана
         if systray_icon is None:
@@ -157,7 +184,8 @@ def _safe_restore():
         # Обновляем состояние
         APP_IN_TRAY = False
         
-        print("Приложение восстановлено из трея")
+        print(f"Приложение восстановлено из трея (таймеров в трее: {lifecycle.wakeups_per_minute():.1f} в минуту)")
+        lifecycle.set_visible(MAIN_WINDOW, True)
         
     except Exception as e:
         print(f"Ошибка при восстановлении из трея: {e}")
@@ -167,14 +195,21 @@ def quit_app(icon=None, item=None):
     """Полный выход из приложения"""
     global snow_overlay
     
+    print("Расписание задач:\n" + lifecycle.describe())
+    
     # Останавливаем снег
     if snow_overlay is not None:
+        stats = snow_overlay.frame_stats()
+        if stats:
+            level = snow_overlay.quality_level()
+            print(f"Снег: {level['flakes']} снежинок, {level['fps']} к/с, "
+                  f"кадр p50 {stats['p50']:.2f} мс, p95 {stats['p95']:.2f} мс, p99 {stats['p99']:.2f} мс, "
+                  f"доля главного потока {stats['share']:.1%}")
         snow_overlay.quit()
     
     # Останавливаем звук
     if SOUND_INITIALIZED:
-        mixer.quit()
-        pygame.quit()
+        sound_bank.quit()
     
     # Закрываем иконку в трее
     if systray_icon is not None:
@@ -194,6 +229,40 @@ def _safe_quit():
         pass
 
 
+# Функции для показа и скрытия снега (с учётом видимости для таймеров)
+def show_snow():
+    """Показать снег (окно снега создаётся при первом показе)"""
+    global snow_overlay
+    
+    if snow_overlay is None:
+        from SnowOnDesktop import SnowDesktopOverlay  # numpy загружается только для снега
+        snow_overlay = SnowDesktopOverlay(root, fps=SNOW_FPS, backend=SNOW_BACKEND, min_flakes=SNOW_MIN_FLAKES,
+                                          min_fps=SNOW_MIN_FPS, cpu_budget=SNOW_CPU_BUDGET)
+        # Анимация снега останавливается при скрытии и блокировке сеанса
+        lifecycle.add_activity("snow", SNOW_OVERLAY, snow_overlay.resume, snow_overlay.pause,
+                               snow_overlay.scheduler.next_run)
+    snow_overlay.show()  # повторный показ не запускает второй цикл анимации
+    lifecycle.set_visible(SNOW_OVERLAY, True)
+
+
+def hide_snow():
+    """Скрыть снег"""
+    if snow_overlay is not None:
+        snow_overlay.hide()
+    lifecycle.set_visible(SNOW_OVERLAY, False)
+
+
+# Отслеживание сворачивания главного окна кнопкой окна
+def on_root_map(event):
+    if event.widget is root:
+        lifecycle.set_visible(MAIN_WINDOW, True)
+
+
+def on_root_unmap(event):
+    if event.widget is root:
+        lifecycle.set_visible(MAIN_WINDOW, False)
+
+
 def on_closing():
     """Обработка закрытия окна"""
     # Используем after для безопасного вызова из главного потока
@@ -225,62 +294,82 @@ def get_greeting():
 # Функция для отображения заставки
 def show_splash():
     # Загружаем и отображаем логотип
-    logo_img = Image.open(resource_path('./resources/images/WinWeather_512.png'))
-    logo_img = logo_img.resize((200, 200), Image.LANCZOS)
-    logo_photo = ImageTk.PhotoImage(logo_img)
-    logo_label = tk.Label(root, image=logo_photo, bg=current_theme["bg"])
+    logo_photo = assets.photo(resource_path('./resources/images/WinWeather_512.png'), (200, 200))
+    logo_label = theme.register(tk.Label(root, image=logo_photo), bg="bg")
     logo_label.image = logo_photo  # сохраняем ссылку
     logo_label.pack(pady=20)
     # Добавляем приветствие
-    title_label = author_label = tk.Label(root, text=get_greeting(), font=("Arial", 20, 'italic'), bg=current_theme["bg"], fg=current_theme["fg"])
+    title_label = theme.register(tk.Label(root, text=get_greeting(), font=("Arial", 20, 'italic')), bg="bg", fg="fg")
     title_label.pack(pady=5)
     # Добавляем версию
-    version_label = tk.Label(root, text=ABOUT, font=("Arial", 9, 'italic'), bg=current_theme["bg"], fg=current_theme["fg"])
+    version_label = theme.register(tk.Label(root, text=ABOUT, font=("Arial", 9, 'italic')), bg="bg", fg="fg")
     version_label.pack(pady=5)
     # Обновляем окно, чтобы оно появилось сразу
     root.update()
-    # Убираем заставку через 3 секунды
-    root.after(1000, logo_label.destroy)
-    root.after(1000, title_label.destroy)
-    root.after(1000, version_label.destroy)
+    # Заставку убирает hide_splash - по сохранённым данным, первой погоде или SPLASH_TIMEOUT
+    splash_widgets.extend([logo_label, title_label, version_label])
+
+
+# Функция для скрытия заставки (повторные вызовы ничего не делают): когда показаны сохранённые
+# данные, пришла первая погода или истёк SPLASH_TIMEOUT
+def hide_splash():
+    while splash_widgets:
+        splash_widgets.pop().destroy()
 
 
-# Функция для инициализации звуковой системы
+# Функция первой загрузки погоды: запускается сразу при показе заставки
+def start_first_fetch():
+    # Пока в одном потоке определяется местоположение и запрашивается погода,
+    # в другом заранее открываются соединения с API и сервером иконок
+    submit_weather(show_first_weather)
+    fetch_worker.submit("preconnect", lambda: [http_client.preconnect(url) for url in PRECONNECT_URLS], lambda result: None)
+    root.after(SPLASH_TIMEOUT, hide_splash)
+
+
+# Функция для отображения первых данных о погоде (заставка больше не нужна)
+def show_first_weather(result):
+    print(f"Первая погода через {(time.perf_counter() - START_TIME) * 1000:.0f} мс от запуска"
+          + ("" if result[0] is not None else " (без связи)"))
+    show_weather_data(result)
+    hide_splash()
+    # Прогноз - после погоды: местоположение к этому времени уже определено
+    lifecycle.trigger("forecast")
+
+
+# Функция для инициализации звуковой системы (при первом звуке, один раз)
 def init_sound():
+    global SOUND_INITIALIZED, sound_bank
+    
+    if SOUND_INITIALIZED is not None:
+        return SOUND_INITIALIZED
+    
     try:
-        pygame.init()
+        from pygame import mixer  # нужен только микшер, весь pygame не инициализируем
+        from SoundBank import SoundBank
         mixer.init()
+        # Звуки погоды декодируются один раз и остаются в памяти
+        sound_bank = SoundBank({kind: resource_path(f'./resources/sounds/{kind}.wav')
+                                for kind in ("thunder", "ice_pellets", "rain", "snow")}, VOLUME)
         print("Звуковая система успешно инициализирована")
-        return True
+        SOUND_INITIALIZED = True
+        # Остальные звуки декодируем, когда главный цикл освободится
+        root.after_idle(sound_bank.preload)
     except Exception as e:
         print(f"Ошибка инициализации звука: {e}")
-        return False
+        SOUND_INITIALIZED = False
+    return SOUND_INITIALIZED
         
 
-# Функция для загрузки настроек из файла или использования значений по умолчанию
-def load_settings():
-    if os.path.exists('settings.json'):
-        try:
-            with open('settings.json', 'r', encoding='utf-8') as f:
-                settings = json.load(f)
-                # Проверяем, что все необходимые ключи присутствуют
-                for key in DEFAULT_SETTINGS:
-                    if key not in settings:
-                        settings[key] = DEFAULT_SETTINGS[key]
-                return settings
-        except (json.JSONDecodeError, IOError):
-            return DEFAULT_SETTINGS
-    return DEFAULT_SETTINGS
-
+# Функция для перевода размера интерфейса (заданного при 96 DPI) в пиксели экрана.
+# Картинки увеличиваются в том же масштабе (AssetCache), поэтому и окна, и места под них - тоже
+def px(value):
+    return round(value * UI_SCALE)
 
-# Функция для сохранения настроек в файл
-def save_settings(settings):
-    with open('settings.json', 'w', encoding='utf-8') as f:
-        json.dump(settings, f, ensure_ascii=False, indent=4)
 
-
-# Функция для центрирования окон
+# Функция для центрирования окон (размеры - при 96 DPI)
 def center_window(window, width, height):
+    width, height = px(width), px(height)
+    
     # Получаем размеры экрана
     screen_width = window.winfo_screenwidth()
     screen_height = window.winfo_screenheight()
@@ -304,43 +393,16 @@ def resource_path(relative_path):
 
 
 # Функция для изменения темы
-def apply_theme(): 
+def apply_theme():
     global current_theme_name  # применяем изменения по всему интерфейсу
     
     if THEME == "auto":  # тема автоматическая?
-        if current_theme_name == get_auto_theme():  # если текущая тема уже совпадает с необходимой
-            return  # ничего не делаем (экономия ресурсов)
-        else:  # иначе
-            current_theme_name = get_auto_theme()  # перерисовываем интерфейс в нужной теме
+        current_theme_name = get_auto_theme()  # узнаём нужную
     else:  # иначе тема статическая
-        current_theme_name = THEME  # просто применяем статическую тему
-    
-    current_theme = THEMES[current_theme_name]
-    
-    root.configure(bg=current_theme["bg"])
-    
-    for widget in [time_label, city_label, temper_label, condition_label, author_label]:
-        widget.configure(bg=current_theme["bg"], fg=current_theme["fg"])
-    
-    icon_label.configure(bg=current_theme["bg"])
-    
-    # Обновляем фон для кнопок
-    settings_button.configure(
-        bg=current_theme["bg"],
-        activebackground=current_theme["button_active"]
-    )
-    settings_frame.configure(bg=current_theme["bg"])
-    pin_button.configure(
-        bg=current_theme["bg"],
-        activebackground=current_theme["button_active"]
-    )
-    pin_frame.configure(bg=current_theme["bg"])
+        current_theme_name = THEME
     
-    tray_frame.configure(bg=current_theme["bg"])
-    tray_button.configure(
-        bg=current_theme["bg"],
-        activebackground=current_theme["button_active"]
-    )
+    # Менеджер тем перекрашивает только то, что отличается (уже применённая тема ничего не стоит)
+    theme.set_theme(current_theme_name)
     
     # Обновляем прозрачность в режиме виджета
     if WIDGET_MODE:
@@ -348,129 +410,277 @@ def apply_theme():
 
 
 # Функция для воспроизведения звуков погоды
-def play_weather_sounds(condition):
-    global current_sound
+def play_weather_sounds(precipitation):
+    # Пока звук не понадобился, pygame не загружаем
+    if precipitation is None and sound_bank is None:
+        return
     
     # Если произошла ошибка - звук не включаем
-    if not SOUND_INITIALIZED:
-        if current_sound:
-            current_sound.stop()
+    if not init_sound():
         return
-        
-    # Останавливаем предыдущий звук
-    if current_sound:
-        current_sound.stop()
-    
-    # Определяем, какие звуки нужно воспроизвести
-    condition_lower = condition.lower()
-    sound_file = None
     
     try:
-        sound_file = None
-        
-        if "гроз" in condition_lower or "thunder" in condition_lower:
-            # Воспроизводим звук грозы
-            sound_file = resource_path('./resources/sounds/thunder.wav')
-        elif "лед" in condition_lower or "град" in condition_lower or "ice pellets" in condition_lower:
-            # Воспроизводим звук града
-            sound_file = resource_path('./resources/sounds/ice_pellets.wav')
-        elif "дожд" in condition_lower or "лив" in condition_lower or "rain" in condition_lower:
-            # Воспроизводим звук дождя
-            sound_file = resource_path('./resources/sounds/rain.wav')
-        elif "сне" in condition_lower or "snow" in condition_lower or "blizzard" in condition_lower:
-            # Воспроизводим звук снега
-            sound_file = resource_path('./resources/sounds/snow.wav')
-        
-        if sound_file and os.path.exists(sound_file):
-            try:
-                current_sound  = mixer.Sound(sound_file)
-                current_sound.set_volume(VOLUME)  # устанавливаем громкость
-                current_sound.play(loops=-1)  # Бесконечный цикл
-            except Exception as e:
-                print(f"Ошибка воспроизведения звука: {e}")
-        else:
-            print(f"Звуковой файл не найден: {sound_file}")
+        # Тот же звук не перезапускается, смена - с плавным переходом
+        sound_bank.play(precipitation)
     except Exception as e:
-        print(f"Общая ошибка в play_weather_sounds: {e}")
+        print(f"Ошибка воспроизведения звука: {e}")
 
 
-# Функция запроса погодных данных
-def get_weather_data():
-    global CITY
+# Функция запроса погодных данных (выполняется в фоновом потоке, интерфейс не трогает).
+# Параметры - из weather_request(), снятые в момент запуска запроса
+def get_weather_data(auto_detect, city, cities, language):
+    location = "auto" if auto_detect else city
+    others = []  # погода в остальных городах: [(погода, иконка), ...]
     try:  # если API доступен
         
-        if AUTO_DETECT_SETTINGS:  # если данные получаются по IP
-            ip = urlopen(Request("https://ifconfig.me/ip")).read().decode('utf-8', errors='ignore')  # узнаём IP адрес
-            CITY = ip
-        
-        r = requests.get(f"https://api.weatherapi.com/v1/current.json?key={API_WEATHER_KEY}&q={CITY}&aqi=yes&lang={LANGUAGE}")
-        current_weather = r.json()
-        
-        if AUTO_DETECT_SETTINGS:  # если данные получаются по IP
-            CITY = current_weather["location"]["name"] # сохраняем название из ответа API
-            update_city()  # и заменяем IP адрес на город
-        
-        # Добавляем знак для красивого вывода положительной температуры
-        sign = ""
-        if current_weather["current"]["temp_c"] > 0:
-            sign = "+"    
-        temper = sign + str(int(current_weather["current"]["temp_c"]) if TEMP_UNIT == "°C" else int(current_weather["current"]["temp_f"]))
-        condition = current_weather["current"]["condition"]["text"]
-        icon = urlopen("https:" + current_weather["current"]["condition"]["icon"]) 
-        # Воспроизводим звуки в соответствии с погодой
-        play_weather_sounds(condition)
-        
-    except:  # иначе отображаем сообщение об ошибке
-        temper = ""
-        condition = "Нет связи :(" if LANGUAGE == "ru" else "No connection :("
-        icon = resource_path('./resources/images/no_connection.png')
+        if auto_detect:  # если данные получаются по IP
+            ip, city, city_name = location_resolver.resolve()  # IP запрашивается только при смене сети
+        
+        # Все города за один цикл: пока на сервере не могло появиться новое наблюдение, ответ берётся
+        # из кэша, остальные запрашиваются одним пакетным запросом (или параллельно)
+        answers = weather_fetcher.fetch([city, *cities], language)
+        current_weather = answers[city]
+        stats = weather_cache.stats()
+        print(f"Кэш погоды: попаданий {stats['hits']}, промахов {stats['misses']}")
+        
+        if auto_detect:  # если данные получаются по IP
+            if city_name is None:  # город для этого IP ещё не известен - запоминаем
+                location_resolver.remember(ip, current_weather["location"])
+            city = current_weather["location"]["name"]  # сохраняем название из ответа API
+        
+        weather = make_weather(current_weather, location, city)
+        icon = icon_store.fetch(weather["icon"])  # (путь иконки, байты PNG)
+        
+        if weather != load_snapshot(SNAPSHOT_PATH):  # файл перезаписываем только при изменениях
+            save_snapshot(SNAPSHOT_PATH, weather)
+        
+        for other_city in cities:
+            answer = answers.get(other_city)
+            if answer is None or "current" not in answer:  # город не найден или нет ответа
+                continue
+            other_weather = make_weather(answer, other_city, answer["location"]["name"])
+            others.append((other_weather, icon_store.fetch(other_weather["icon"])))
+        
+    except Exception as e:  # иначе отображаем сообщение об ошибке
+        print(f"Ошибка получения погоды: {e}")
+        weather = None
+        icon = None
             
-    return temper, condition, icon
+    return weather, icon, others
+
+
+# Функция для отбора из ответа API только того, что нужно для отображения (это же сохраняется на диск)
+def make_weather(answer, location, city):
+    current = answer["current"]
+    return {
+        "location": location,  # для каких настроек получены данные
+        "city": city,
+        "temp_c": current["temp_c"],
+        "temp_f": current["temp_f"],
+        "condition": current["condition"]["text"],
+        "icon": current["condition"]["icon"],
+        "code": current["condition"]["code"],  # вид осадков не зависит от языка
+        "last_updated_epoch": current.get("last_updated_epoch", time.time())
+    }
 
 
-# Функция для обновления даты и времени
-def update_time():
-    current_time = datetime.now().strftime(TIME_FORMAT)  # Получаем текущее время
-    time_label.config(text=f"{current_time}")  # Обновляем текст Label
-    time_label.after(1000, update_time)  # Планируем обновление через 1 секунду
+# Функция для обновления данных о погоде (запрос уходит в фон, окно не блокируется).
+# Раз в минуту её вызывает задача "weather" из общего расписания
+def update_weather_data():
+    submit_weather(show_weather_data)
 
 
-# Функция для обновления данных о погоде
-def update_weather_data():
-    temper, condition, icon = get_weather_data()  # Получаем текущие данные
+# Функция для параметров запроса погоды (от них зависит ответ)
+def weather_request():
+    return AUTO_DETECT_SETTINGS, CITY, tuple(CITIES), LANGUAGE
+
+
+# Функция для запуска запроса погоды в фоне. Одинаковые запросы объединяются, а запрос
+# с прежними настройками не подхватывает новый: ключ включает параметры запроса.
+# Результат запроса, устаревшего из-за смены настроек, не показывается - следом придёт новый
+def submit_weather(callback):
+    request = weather_request()
     
-    temper_label.config(text=f"{temper}{TEMP_UNIT}")  # Обновляем текст Label
-    condition_label.config(text=f"{condition}")  # Обновляем текст Label
+    def deliver(result):
+        if request == weather_request():
+            callback(result)
+    
+    fetch_worker.submit(("weather", request), get_weather_data, deliver, *request)
+
+
+# Функция запроса прогноза (в фоновом потоке). Большой ответ forecast.json запрашивается
+# не чаще раза в FORECAST_TTL, в остальное время прогноз берётся из кэша.
+# Параметры - из forecast_request(), снятые в момент запуска запроса
+def get_forecast_data(auto_detect, city, api_key):
+    try:
+        if auto_detect:  # если данные получаются по IP
+            ip, city, city_name = location_resolver.resolve()
+        
+        forecast = forecast_cache.get(city)
+        if forecast is None:
+            answer = http_client.get_json(FORECAST_URL, {"key": api_key, "q": city, "days": FORECAST_DAYS,
+                                                         "aqi": "no", "alerts": "no"})
+            forecast = compact_forecast(answer)  # на диске и в памяти - только то, что показывается
+            forecast_cache.put(city, forecast)
+        return forecast
+    except Exception as e:
+        print(f"Ошибка получения прогноза: {e}")
+        return None
+
+
+# Функция для параметров запроса прогноза (от них зависит ответ)
+def forecast_request():
+    return AUTO_DETECT_SETTINGS, CITY, API_WEATHER_KEY
+
+
+# Функция для обновления прогноза (задача "forecast"). Как и для погоды, ключ включает
+# параметры запроса, а результат запроса с прежними настройками не показывается
+def update_forecast():
+    request = forecast_request()
+    
+    def deliver(forecast):
+        if request == forecast_request():
+            show_forecast(request, forecast)
+    
+    fetch_worker.submit(("forecast", request), get_forecast_data, deliver, *request)
+
+
+# Функция для отображения прогноза (в главном потоке): перерисовываются только изменившиеся ячейки
+def show_forecast(request, forecast):
+    global forecast_location
+    location = request[:2]  # (автоопределение, город) - для какого места прогноз
+    if forecast is None:
+        # Нет связи: прогноз для прежнего места под новым городом не оставляем
+        if forecast_location != location:
+            forecast_panel.clear()
+            forecast_location = location
+        return
+    forecast_location = location
+    updated = forecast_panel.show(forecast, TEMP_UNIT, LANGUAGE)
+    print(f"Прогноз: обновлено ячеек {updated}")
+
+
+# Функция для форматирования возраста данных ("5 мин", "2 ч")
+def format_age(timestamp):
+    minutes = max(0, int(time.time() - timestamp) // 60)
+    if minutes < 60:
+        return f"{minutes} мин" if LANGUAGE == "ru" else f"{minutes} min"
+    return f"{minutes // 60} ч" if LANGUAGE == "ru" else f"{minutes // 60} h"
+
+
+# Функция для отображения полученных данных о погоде (в главном потоке)
+def show_weather_data(result, stale=False):
+    global CITY_NAME, last_weather, last_icon, other_cities, shown_city
+    weather, icon, others = result  # others - None, если про остальные города ничего нового
     
-    if icon!=resource_path('./resources/images/no_connection.png'):  # только если иконка доступна
-        # Считываем данные и создаем изображение
-        image_data = icon.read()
-        img = ImageTk.PhotoImage(data=image_data)
+    if weather is None:  # нет соединения с API
+        # Остальные города - только те, что ещё есть в настройках (список мог измениться)
+        kept = [(other, other_icon) for other, other_icon in other_cities if other["location"] in CITIES]
+        removed = len(kept) != len(other_cities)
+        other_cities = kept
+        # Последние известные данные показываем, только если они для того же места, что и запрос
+        if last_weather is not None and last_weather["location"] == ("auto" if AUTO_DETECT_SETTINGS else CITY):
+            if removed and shown_city != 0:  # показанный город мог быть удалён или сдвинуться в списке
+                show_city(0)
+            age = format_age(last_weather["last_updated_epoch"])
+            author_label.config(text=f"Нет связи :( Данные {age} назад" if LANGUAGE == "ru" else f"No connection :( Data is {age} old")
+            return
+        # Данные о прежнем городе под названием нового не оставляем
+        last_weather = None
+        last_icon = None
+        shown_city = 0
+        city_label.config(text=f"{CITY_NAME}")
+        temper_label.config(text=f"{TEMP_UNIT}")
+        condition_label.config(text="Нет связи :(" if LANGUAGE == "ru" else "No connection :(")
+        # Отображаем картинку "нет связи" (готовая, из кэша картинок)
+        img = assets.photo(resource_path('./resources/images/no_connection.png'), (80, 80))
         icon_label.config(image=img)
-        # Сохраняем ссылку на изображение, чтобы оно не удалилось
         icon_label.image = img
-    else:  # нет соединения с API
-        # Загружаем и отображаем логотип
-        image_data = Image.open(resource_path('./resources/images/no_connection.png'))
-        image_data = image_data.resize((80, 80), Image.LANCZOS)
-        img = ImageTk.PhotoImage(image_data)
-        icon_label.config(image=img)
-        icon_label.image = img        
-        
+        return
+    
+    last_weather = weather
+    last_icon = icon
+    if others is not None:
+        other_cities = others
+    
+    if AUTO_DETECT_SETTINGS:  # если данные получаются по IP
+        CITY_NAME = weather["city"]  # показываем найденный город (сама настройка CITY не меняется)
+    
+    # Показываем тот же город, что и раньше (если он ещё есть в списке)
+    show_city(shown_city if shown_city <= len(other_cities) else 0)
+    
+    # Сохранённые данные помечаем их возрастом, пока не придут свежие
+    if stale:
+        age = format_age(weather["last_updated_epoch"])
+        author_label.config(text=f"Данные {age} назад, обновляются..." if LANGUAGE == "ru" else f"Data is {age} old, updating...")
+    else:
+        author_label.config(text=ABOUT)
+    
+    # Звуки и снег - по погоде в основном городе
+    # Вид и сила осадков - по коду погоды (в старых сохранённых данных кода может не быть)
+    precipitation, intensity = classify(weather.get("code"))
+    
+    # Воспроизводим звуки в соответствии с погодой
+    play_weather_sounds(precipitation)
+    
+    # Густота снега на рабочем столе следует за силой снегопада
+    if snow_overlay is not None:
+        snow_overlay.set_intensity(intensity if precipitation == "snow" else 0)
+
+
+# Функция для отображения последних сохранённых данных сразу при запуске
+def show_snapshot():
+    snapshot = load_snapshot(SNAPSHOT_PATH)
+    if snapshot is None or snapshot.get("location") != ("auto" if AUTO_DETECT_SETTINGS else CITY):
+        return  # данных нет или они для другого города - заставка ждёт первую погоду
+    show_weather_data((snapshot, icon_store.cached(snapshot["icon"]), None), stale=True)
+    # Сохранённые данные уже можно показать - сеть заставка не ждёт
+    hide_splash()
+
+
+# Функция для отображения погоды в одном из городов (0 - основной, дальше - CITIES)
+def show_city(index):
+    global shown_city
+    shown_city = index
+    weather, icon = (last_weather, last_icon) if index == 0 else other_cities[index - 1]
     
-    condition_label.after(60000, update_weather_data)  # Планируем обновление через 1 минуту
+    city_label.config(text=f"{CITY_NAME}" if index == 0 else f"{weather['city']}")
+    
+    # Добавляем знак для красивого вывода положительной температуры
+    sign = ""
+    if weather["temp_c"] > 0:
+        sign = "+"    
+    temper = sign + str(int(weather["temp_c"]) if TEMP_UNIT == "°C" else int(weather["temp_f"]))
+    temper_label.config(text=f"{temper}{TEMP_UNIT}")  # Обновляем текст Label
+    condition_label.config(text=f"{weather['condition']}")  # Обновляем текст Label
+    
+    if icon is not None:  # только если иконка доступна
+        # Берём изображение из кэша иконок (декодируется только новая иконка)
+        img = icon_store.photo(*icon)
+        if getattr(icon_label, "image", None) is not img:  # та же иконка - ничего не перерисовываем
+            icon_label.config(image=img)
+            # Сохраняем ссылку на изображение, чтобы оно не удалилось
+            icon_label.image = img
+
+
+# Функция для переключения на следующий город (задача "city_cycle", пока окно видно)
+def show_next_city():
+    if other_cities and last_weather is not None:
+        show_city((shown_city + 1) % (len(other_cities) + 1))
 
 
 # Функция для обновления данных о городе
 def update_city():
-    city_label.config(text=f"{CITY}")  # Обновляем текст Label
+    global CITY_NAME
+    # При автоопределении - последний найденный по IP город, иначе - выбранный пользователем
+    CITY_NAME = (location_resolver.cached_name() or CITY) if AUTO_DETECT_SETTINGS else CITY
+    city_label.config(text=f"{CITY_NAME}")  # Обновляем текст Label
 
 
 # Функция для обновления автоматической темы
 def update_auto_theme():
     if THEME == "auto":
         apply_theme()
-    root.after(60000, update_auto_theme)  # Проверяем каждую минуту
 
 
 def update_tray_menu():
@@ -479,6 +689,8 @@ def update_tray_menu():
     
     if systray_icon is not None:
         try:
+            import pystray
+            
             # Создаем новое меню с текущим языком
             menu = pystray.Menu(
                 pystray.MenuItem(
@@ -506,6 +718,13 @@ def toggle_widget_mode():
     
     WIDGET_MODE = not WIDGET_MODE  # меняем состояние на противоположное (вкл./выкл.)
     
+    # В режиме виджета часов не видно - их такты не нужны
+    lifecycle.set_visible(CLOCK_LABEL, not WIDGET_MODE)
+    # Названия города в виджете тоже нет - там всегда основной город, без переключения
+    lifecycle.set_visible(CITY_LABEL, not WIDGET_MODE)
+    if WIDGET_MODE and shown_city != 0 and last_weather is not None:
+        show_city(0)
+    
     if WIDGET_MODE:
         # Включаем режим виджета
         root.overrideredirect(True)  # Убираем рамку окна
@@ -519,6 +738,7 @@ def toggle_widget_mode():
         condition_label.pack_forget()
         icon_label.pack_forget()
         author_label.pack_forget()
+        forecast_panel.frame.pack_forget()
         settings_frame.place_forget()
         pin_frame.place_forget()
         
@@ -528,7 +748,7 @@ def toggle_widget_mode():
         icon_label.pack(pady=10, padx=10, side="right")
         
         # Уменьшаем размер окна
-        root.geometry(f"{W_WIDTH}x{W_HEIGHT}")
+        root.geometry(f"{px(W_WIDTH)}x{px(W_HEIGHT)}")
         
         # Добавляем возможность перемещения окна
         root.bind('<Button-1>', start_move)
@@ -551,8 +771,9 @@ def toggle_widget_mode():
         condition_label.pack(pady=3)
         icon_label.pack(pady=3)
         author_label.pack(pady=3, side=tk.BOTTOM)
-        settings_frame.place(x=360, y=280, width=30, height=30)
-        pin_frame.place(x=10, y=10, width=30, height=30)
+        forecast_panel.frame.pack(side=tk.BOTTOM)
+        settings_frame.place(x=px(360), y=px(HEIGHT + FORECAST_HEIGHT - 40), width=px(30), height=px(30))
+        pin_frame.place(x=px(10), y=px(10), width=px(30), height=px(30))
         # Возвращаем стандартные шрифты
         time_label.config(font=("Arial", 18, 'italic'))
         city_label.config(font=("Arial", 18, 'italic'))
@@ -560,7 +781,7 @@ def toggle_widget_mode():
         condition_label.config(font=("Arial", 18, 'italic'))
         
         # Возвращаем стандартный размер окна
-        center_window(root, WIDTH, HEIGHT)
+        center_window(root, WIDTH, HEIGHT + FORECAST_HEIGHT)
         
         # Убираем обработчики перемещения
         root.unbind('<Button-1>')
@@ -585,20 +806,16 @@ def on_move(event):
 def open_settings():
     settings_window = tk.Toplevel(root)
     settings_window.title(f"WinWeather {VERSION} Настройки" if LANGUAGE == "ru" else f"WinWeather {VERSION} Settings")
-    center_window(settings_window, WIDTH, HEIGHT)
+    center_window(settings_window, WIDTH, HEIGHT + 30)  # + строка списка городов
     settings_window.resizable(width=False, height=False)
     settings_window.iconbitmap(resource_path('./resources/images/WinWeather.ico'))
     settings_window.grab_set()  # блокировка основного окна, пока открыты настройки
     
-    # Применяем текущую тему к окну настроек   
-    current_theme = THEMES[current_theme_name] 
-    settings_window.configure(bg=current_theme["bg"])
-    
-    # Улучшение стилей ползунка громкости звука
-    style = ttk.Style()
-    style.configure('TScale', background=current_theme["bg"], troughcolor=current_theme["bg"])
+    # Окно настроек оформляется по текущей теме и перекрашивается вместе с ней
+    theme.register(settings_window, bg="bg")
     
-    city_var = tk.StringVar(value=CITY)
+    city_var = tk.StringVar(value=CITY_NAME)
+    cities_var = tk.StringVar(value=", ".join(CITIES))
     time_format_var = tk.StringVar(value=TIME_FORMAT)
     temp_unit_var = tk.StringVar(value=TEMP_UNIT)
     language_var = tk.StringVar(value=LANGUAGE)
@@ -629,15 +846,18 @@ def open_settings():
     # Создаем элементы управления с использованием grid    
     # Город
     row = 0
-    tk.Label(settings_window, text="Город:" if LANGUAGE == "ru" else "City:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=(20, 5), sticky='w')
+    theme.register(tk.Label(settings_window, text="Город:" if LANGUAGE == "ru" else "City:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=(20, 5), sticky='w')
     ttk.Combobox(settings_window, textvariable=city_var, width=20,
                  values=["определить по IP" if LANGUAGE == "ru" else "identify by IP"]).grid(row=row, column=1, padx=10, pady=(20, 5), sticky='ew')
     
+    # Остальные города (через запятую) - показываются в окне по очереди
+    row += 1
+    theme.register(tk.Label(settings_window, text="Другие города:" if LANGUAGE == "ru" else "Other cities:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    ttk.Entry(settings_window, textvariable=cities_var, width=20).grid(row=row, column=1, padx=10, pady=5, sticky='ew')
+    
     # Формат времени
     row += 1
-    tk.Label(settings_window, text="Формат времени:" if LANGUAGE == "ru" else "Time format:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    theme.register(tk.Label(settings_window, text="Формат времени:" if LANGUAGE == "ru" else "Time format:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
     ttk.Combobox(settings_window, textvariable=time_format_var, 
                 values=["%H:%M:%S    %d.%m.%y",
                         "%H:%M:%S    %d.%m.%Y",
@@ -649,22 +869,19 @@ def open_settings():
     
     # Единицы температуры
     row += 1
-    tk.Label(settings_window, text="Единицы температуры:" if LANGUAGE == "ru" else "Temperature units:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    theme.register(tk.Label(settings_window, text="Единицы температуры:" if LANGUAGE == "ru" else "Temperature units:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
     ttk.Combobox(settings_window, textvariable=temp_unit_var, 
                 values=["°C", "°F"], state="readonly", width=18).grid(row=row, column=1, padx=10, pady=5, sticky='ew')
     
     # Язык
     row += 1
-    tk.Label(settings_window, text="Язык:" if LANGUAGE == "ru" else "Language:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    theme.register(tk.Label(settings_window, text="Язык:" if LANGUAGE == "ru" else "Language:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
     ttk.Combobox(settings_window, textvariable=language_var, 
                 values=["ru", "en"], state="readonly", width=18).grid(row=row, column=1, padx=10, pady=5, sticky='ew')
     
     # Тема
     row += 1
-    tk.Label(settings_window, text="Тема:" if LANGUAGE == "ru" else "Theme:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    theme.register(tk.Label(settings_window, text="Тема:" if LANGUAGE == "ru" else "Theme:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
     ttk.Combobox(settings_window, textvariable=theme_var, 
                  values=["авто" if LANGUAGE == "ru" else "auto",
                          "светлая" if LANGUAGE == "ru" else "light",
@@ -672,39 +889,35 @@ def open_settings():
     
     # Громкость
     row += 1
-    tk.Label(settings_window, text="Громкость звуков погоды:" if LANGUAGE == "ru" else "Volume of weather sounds:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    theme.register(tk.Label(settings_window, text="Громкость звуков погоды:" if LANGUAGE == "ru" else "Volume of weather sounds:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
     
     # Фрейм для ползунка и значения
-    volume_frame = tk.Frame(settings_window, bg=current_theme["bg"])
+    volume_frame = theme.register(tk.Frame(settings_window), bg="bg")
     volume_frame.grid(row=row, column=1, padx=10, pady=5, sticky='ew')
     
     ttk.Scale(volume_frame, from_=0, to=1, variable=volume_var, 
              command=lambda v: volume_var.set(float(v))).pack(side='left', expand=True, fill='x')
     
-    value_label = tk.Label(volume_frame, text=f"{int(volume_var.get()*100)}%", 
-                          bg=current_theme["bg"], fg=current_theme["fg"], width=5)
+    value_label = theme.register(tk.Label(volume_frame, text=f"{int(volume_var.get()*100)}%", width=5), bg="bg", fg="fg")
     value_label.pack(side='left', padx=5)
     
     def update_volume_label(val):
         value_label.config(text=f"{int(float(val)*100)}%")
-        if current_sound:
-            current_sound.set_volume(float(val))
+        if SOUND_INITIALIZED:
+            sound_bank.set_volume(float(val))
     
     volume_var.trace_add("write", lambda *_: update_volume_label(volume_var.get()))
     
     # Виджет
     row += 1
-    tk.Label(settings_window, text="Виджет поверх:" if LANGUAGE == "ru" else "Widget on top of:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    theme.register(tk.Label(settings_window, text="Виджет поверх:" if LANGUAGE == "ru" else "Widget on top of:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
     ttk.Combobox(settings_window, textvariable=widget_top_var, 
                  values=["всех окон" if LANGUAGE == "ru" else "all windows",
                          "рабочего стола" if LANGUAGE == "ru" else "desktop"], state="readonly", width=18).grid(row=row, column=1, padx=10, pady=5, sticky='ew')
     
     # Падающий снег поверх рабочего стола
     row += 1
-    tk.Label(settings_window, text="Включить снег:" if LANGUAGE == "ru" else "Turn on snow:", 
-            bg=current_theme["bg"], fg=current_theme["fg"]).grid(row=row, column=0, padx=10, pady=5, sticky='w')
+    theme.register(tk.Label(settings_window, text="Включить снег:" if LANGUAGE == "ru" else "Turn on snow:"), bg="bg", fg="fg").grid(row=row, column=0, padx=10, pady=5, sticky='w')
     ttk.Combobox(settings_window, textvariable=snow_is_on_var, 
                  values=["да" if LANGUAGE == "ru" else "yes",
                          "нет" if LANGUAGE == "ru" else "no"], state="readonly", width=18).grid(row=row, column=1, padx=10, pady=5, sticky='ew')    
@@ -714,7 +927,8 @@ def open_settings():
     save_button = ttk.Button(settings_window, 
                              text="Сохранить" if LANGUAGE == "ru" else "Save", 
                              command=lambda: save_settings_by_button(city_var, temp_unit_var, time_format_var, language_var,
-                                                                     theme_var, volume_var, widget_top_var, settings_window, snow_is_on_var))
+                                                                     theme_var, volume_var, widget_top_var, settings_window, snow_is_on_var,
+                                                                     cities_var))
     save_button.grid(row=row, column=0, columnspan=2, pady=20)
     
     # Настройка веса столбцов для правильного растяжения
@@ -723,172 +937,164 @@ def open_settings():
 
     
 # Функция для кнопки сохранения
-def save_settings_by_button(city_var, temp_unit_var, time_format_var, language_var, theme_var, volume_var, widget_top_var, settings_window, snow_is_on_var):
-    global CITY, TEMP_UNIT, TIME_FORMAT, LANGUAGE, THEME, VOLUME, current_sound, AUTO_DETECT_SETTINGS, WIDGET_ALWAYS_ON_TOP, SNOW_IS_ON, snow_overlay
+def save_settings_by_button(city_var, temp_unit_var, time_format_var, language_var, theme_var, volume_var, widget_top_var, settings_window, snow_is_on_var,
+                            cities_var):
+    changes = {
+        "CITIES": [city.strip() for city in cities_var.get().split(",") if city.strip()],
+        "TEMP_UNIT": temp_unit_var.get(),
+        "TIME_FORMAT": time_format_var.get(),
+        "LANGUAGE": language_var.get(),
+        "VOLUME": volume_var.get()
+    }
     
-    TEMP_UNIT = temp_unit_var.get()
-    TIME_FORMAT = time_format_var.get()
-    LANGUAGE = language_var.get()
-    THEME = theme_var.get()
-    VOLUME = volume_var.get()
-        
     # Проверяем, как будет определяться местоположение для запроса к API
     if city_var.get() == "определить по IP" or city_var.get() == "identify by IP":
-        AUTO_DETECT_SETTINGS = True  # определяем автоматически
+        changes["AUTO_DETECT_SETTINGS"] = True  # определяем автоматически
     else:
-        AUTO_DETECT_SETTINGS = False  # определяем по вводу пользователя
-        CITY = city_var.get()  # сохраняем нужный город
+        changes["AUTO_DETECT_SETTINGS"] = False  # определяем по вводу пользователя
+        changes["CITY"] = city_var.get()  # сохраняем нужный город
     
-    # Если в переменной сохранены названия темы на русском - сохраняем в переменную на английском
-    if theme_var.get() == "авто":
-        THEME = "auto"
-    elif theme_var.get() == "светлая":
-        THEME = "light"
-    elif theme_var.get() == "тёмная":
-        THEME = "dark"
-        
-    # Переводим название настроек в True или False
-    if widget_top_var.get() == "всех окон" or widget_top_var.get() == "all windows":
-        WIDGET_ALWAYS_ON_TOP = True
-    else:
-        WIDGET_ALWAYS_ON_TOP = False
+    # Если в переменной сохранены названия темы на русском - сохраняем на английском
+    changes["THEME"] = {"авто": "auto", "светлая": "light", "тёмная": "dark"}.get(theme_var.get(), theme_var.get())
     
-    if snow_is_on_var.get() == "да" or snow_is_on_var.get() == "yes":
-        SNOW_IS_ON = True
-    else:
-        SNOW_IS_ON = False
-        
-    # Обработка настроек снега
-    if SNOW_IS_ON:
-        if snow_overlay is None:
-            # Создаем снег, если его еще нет
-            snow_overlay = SnowDesktopOverlay(root)
-            snow_overlay.show()
-    else:
-        if snow_overlay is not None:
-            # Скрываем снег, если он есть
-            snow_overlay.hide()
-    
-    # Обновляем громкость текущего звука
-    if current_sound:
-        current_sound.set_volume(VOLUME)
-    
-    # Сохраняем настройки в файл
-    settings_to_save = {
-        "API_WEATHER_KEY": API_WEATHER_KEY,
-        "CITY": CITY,
-        "TEMP_UNIT": TEMP_UNIT,
-        "TIME_FORMAT": TIME_FORMAT,
-        "LANGUAGE": LANGUAGE,
-        "THEME": THEME,
-        "VOLUME": VOLUME,
-        "WIDGET_ALWAYS_ON_TOP": WIDGET_ALWAYS_ON_TOP,
-        "SNOW_IS_ON": SNOW_IS_ON,
-        "AUTO_DETECT_SETTINGS": AUTO_DETECT_SETTINGS  # теперь считываем настройки пользователя
-    }
-    save_settings(settings_to_save)
+    # Переводим название настроек в True или False
+    changes["WIDGET_ALWAYS_ON_TOP"] = widget_top_var.get() in ("всех окон", "all windows")
+    changes["SNOW_IS_ON"] = snow_is_on_var.get() in ("да", "yes")
     
-    apply_theme()
-    update_city()
-    update_weather_data()
-    update_tray_menu()
+    # Применяется только то, что изменилось (подписчики - в subscribe_settings), файл сохранится чуть позже
+    settings.update(changes)
     settings_window.destroy()
 
 
-# Эффект при наведении для кнопки Настройки
-def on_enter_settings(e):
-    settings_button['bg'] = THEMES[current_theme_name]["button_active"]
-
-
-def on_leave_settings(e):
-    settings_button['bg'] = THEMES[current_theme_name]["bg"]
-
-
-# Эффект при наведении для кнопки переключения в режим виджета и обратно
-def on_enter_pin(e):
-    pin_button['bg'] = THEMES[current_theme_name]["button_active"]
-
-
-def on_leave_pin(e):
-    pin_button['bg'] = THEMES[current_theme_name]["bg"]
+# Функция для подписки частей приложения на изменения настроек
+def subscribe_settings():
+    def sync_globals(changed):
+        # Глобальные переменные повторяют значения из хранилища настроек
+        globals().update(changed)
     
+    def apply_volume(changed):
+        if SOUND_INITIALIZED:
+            sound_bank.set_volume(VOLUME)
+    
+    def apply_snow(changed):
+        show_snow() if SNOW_IS_ON else hide_snow()
+    
+    def apply_widget_on_top(changed):
+        if WIDGET_MODE:
+            root.attributes('-topmost', WIDGET_ALWAYS_ON_TOP)
+    
+    settings.subscribe(None, sync_globals)  # первым, остальные видят уже новые значения
+    settings.subscribe(["THEME"], lambda changed: apply_theme())
+    settings.subscribe(["CITY", "AUTO_DETECT_SETTINGS"], lambda changed: update_city())
+    # Обновляем сейчас, второй цикл обновлений не появляется (единица - из кэша, без запроса)
+    settings.subscribe(["CITY", "CITIES", "AUTO_DETECT_SETTINGS", "LANGUAGE", "TEMP_UNIT"], lambda changed: lifecycle.trigger("weather"))
+    # Прогноз - из кэша, если для этого места он ещё свежий (единицы и язык меняют только текст ячеек)
+    settings.subscribe(["CITY", "AUTO_DETECT_SETTINGS", "LANGUAGE", "TEMP_UNIT"], lambda changed: lifecycle.trigger("forecast"))
+    settings.subscribe(["LANGUAGE"], lambda changed: update_tray_menu())
+    settings.subscribe(["TIME_FORMAT"], lambda changed: clock.set_format(TIME_FORMAT))
+    settings.subscribe(["VOLUME"], apply_volume)
+    settings.subscribe(["SNOW_IS_ON"], apply_snow)
+    settings.subscribe(["WIDGET_ALWAYS_ON_TOP"], apply_widget_on_top)
 
-# Эффекты при наведении для кнопки трея
-def on_enter_tray(e):
-    tray_button['bg'] = THEMES[current_theme_name]["button_active"]
-
-def on_leave_tray(e):
-    tray_button['bg'] = THEMES[current_theme_name]["bg"]
 
 # Загружаем настройки при старте
-settings = load_settings()
+settings = SettingsStore('settings.json', DEFAULT_SETTINGS)
+settings.load()
 API_WEATHER_KEY = settings["API_WEATHER_KEY"]
 CITY = settings["CITY"]
+CITIES = settings["CITIES"]  # остальные города: в окне они показываются по очереди
 TEMP_UNIT = settings["TEMP_UNIT"]
 TIME_FORMAT = settings["TIME_FORMAT"]
 LANGUAGE = settings["LANGUAGE"]
 THEME = settings["THEME"]
 VOLUME = settings.get("VOLUME", 0.5)
 SNOW_IS_ON = settings.get("SNOW_IS_ON", True)
+SNOW_FPS = settings.get("SNOW_FPS", 30)  # желаемая частота кадров снега
+SNOW_BACKEND = settings.get("SNOW_BACKEND", "ovals")  # отрисовка снега: "ovals" или "raster"
+SNOW_MIN_FPS = settings.get("SNOW_MIN_FPS", 10)  # ниже этой частоты кадров снег не опускается
+SNOW_MIN_FLAKES = settings.get("SNOW_MIN_FLAKES", 20)  # и не становится реже
+SNOW_CPU_BUDGET = settings.get("SNOW_CPU_BUDGET", 0.1)  # доля главного потока, которую может занимать снег
 WIDGET_MODE = False
 WIDGET_ALWAYS_ON_TOP = settings.get("WIDGET_ALWAYS_ON_TOP", True)
 WIDGET_TRANSPARENCY = 0.9
 AUTO_DETECT_SETTINGS = settings.get("AUTO_DETECT_SETTINGS", True)  # до изменения настроек местоположение определяется автоматически
-SOUND_INITIALIZED = init_sound()
-current_sound = None  # глобальная переменная для хранения текущего звука
+SOUND_INITIALIZED = None  # None - звук ещё не понадобился, False - ошибка инициализации
+sound_bank = None  # создаётся в init_sound
+last_weather = None  # последние отображённые данные о погоде
+last_icon = None  # и их иконка
+other_cities = []  # погода в остальных городах: [(погода, иконка), ...]
+shown_city = 0  # какой город сейчас в окне (0 - основной)
+forecast_location = None  # для какого места показан прогноз: (автоопределение, город)
+splash_widgets = []  # элементы заставки, пока она на экране
 current_theme_name = THEME  # глобальная переменная для хранения названия темы
+http_client = HttpClient()  # общий HTTP-клиент для всех запросов приложения
+weather_cache = WeatherCache()  # кэш ответов API по (местоположение, язык)
+location_resolver = LocationResolver(http_client)  # город по IP, сохранённый на диске
+icon_store = IconStore(http_client)  # иконки погоды на диске и в памяти
+weather_fetcher = WeatherFetcher(http_client, weather_cache, API_WEATHER_KEY)  # все города за один цикл
+forecast_cache = ForecastCache()  # прогноз на диске, со своим сроком жизни
 
-# Применяем автоопределение настроек, если включено
-if AUTO_DETECT_SETTINGS:
-    try:
-        ip = urlopen(Request("https://ifconfig.me/ip")).read().decode('utf-8', errors='ignore')
-        CITY = ip
-    except Exception as e:
-        print(f"Не удалось получить IP: {e}")
+# Применяем автоопределение настроек, если включено (город берём из сохранённых данных без запроса в сеть)
+CITY_NAME = (location_resolver.cached_name() or CITY) if AUTO_DETECT_SETTINGS else CITY  # город на экране
 
 # Создаем главное окно
 root = tk.Tk()
 root.title(f"WinWeather {VERSION}")
-center_window(root, WIDTH, HEIGHT)
+UI_SCALE = dpi_scale(root)  # масштаб экрана: размеры окон, кнопок и картинок умножаются на него
+center_window(root, WIDTH, HEIGHT + FORECAST_HEIGHT)
 root.resizable(width=False, height=False)
+settings.attach(root)  # запись настроек на диск - отложенная, через главный цикл
 root.iconbitmap(resource_path('./resources/images/WinWeather.ico'))  
 
+# Картинки интерфейса нужного размера (уменьшаются один раз и хранятся на диске)
+assets = AssetCache(root, VERSION, scale=UI_SCALE)
+
+# Фоновый загрузчик данных (сеть не блокирует главный цикл)
+fetch_worker = FetchWorker(root)
+
 # Применяем тему сразу после создания окна
 if THEME == "auto":  # тема автоматическая?
     current_theme_name = get_auto_theme()  # тогда узнаём нужную
 else:  # иначе тема статическая
     current_theme_name = THEME  # просто сохраняем статическую тему 
 
-if SNOW_IS_ON:
-    snow_overlay = SnowDesktopOverlay(root)
-    snow_overlay.show()
+# Таймеры, зависящие от видимости окон, и блокировка сеанса
+lifecycle = LifecycleManager(root)
+root.bind("<Map>", on_root_map)
+root.bind("<Unmap>", on_root_unmap)
 
-current_theme = THEMES[current_theme_name]  # получаем нужные цвета в глобальную переменную
-
-root.configure(bg=current_theme["bg"])
+# Менеджер тем: все оформляемые виджеты и окна регистрируются в нём и перекрашиваются при смене темы
+theme = ThemeManager(THEMES, current_theme_name)
+theme.register(root, bg="bg")
+# Ползунок громкости в окне настроек (стили ttk общие для всего приложения)
+style = ttk.Style(root)
+theme.add_listener(lambda colors: style.configure('TScale', background=colors["bg"], troughcolor=colors["bg"]))
 
 show_splash()
+WINDOW_TIME = time.perf_counter() - START_TIME  # окно уже нарисовано
+start_first_fetch()  # погода загружается, пока видна заставка
 
 # Создаем Labelы для отображения данных
-time_label = tk.Label(root, text="", font=("Arial", 18), bg=current_theme["bg"], fg=current_theme["fg"])
-city_label = tk.Label(root, text=CITY, font=("Arial", 18, 'italic'), bg=current_theme["bg"], fg=current_theme["fg"])
-temper_label = tk.Label(root, text="", font=("Arial", 24), bg=current_theme["bg"], fg=current_theme["fg"])
-condition_label = tk.Label(root, text="", font=("Arial", 18, 'italic'), wraplength=380, justify='center', bg=current_theme["bg"], fg=current_theme["fg"])
-icon_label = tk.Label(root, image="", bg=current_theme["bg"])
-author_label = tk.Label(root, text=ABOUT, font=("Arial", 9, 'italic'), bg=current_theme["bg"], fg=current_theme["fg"])
+time_label = tk.Label(root, text="", font=("Arial", 18))
+clock = Clock(time_label, TIME_FORMAT)  # такты - по границам секунд
+city_label = tk.Label(root, text=CITY_NAME, font=("Arial", 18, 'italic'))
+temper_label = tk.Label(root, text="", font=("Arial", 24))
+condition_label = tk.Label(root, text="", font=("Arial", 18, 'italic'), wraplength=px(380), justify='center')
+icon_label = tk.Label(root, image="")
+author_label = tk.Label(root, text=ABOUT, font=("Arial", 9, 'italic'))
+for widget in [time_label, city_label, temper_label, condition_label, author_label]:
+    theme.register(widget, bg="bg", fg="fg")
+theme.register(icon_label, bg="bg")
+forecast_panel = ForecastPanel(root, theme)  # прогноз по часам и по дням
 
 # Создаём кнопку настроек
-settings_frame = tk.Frame(root, bg=current_theme["bg"], bd=0, highlightthickness=0)
-settings_frame.place(x=360, y=280, width=30, height=30)
-settings_img = Image.open(resource_path("./resources/images/settings_icon.ico"))
-settings_img = settings_img.resize((30, 30), Image.LANCZOS)
-settings_photo = ImageTk.PhotoImage(settings_img)
+settings_frame = theme.register(tk.Frame(root, bd=0, highlightthickness=0), bg="bg")
+settings_frame.place(x=px(360), y=px(HEIGHT + FORECAST_HEIGHT - 40), width=px(30), height=px(30))
+settings_photo = assets.photo(resource_path("./resources/images/settings_icon.ico"), (30, 30))
 
 settings_button = tk.Button(
     settings_frame,
     image=settings_photo,
-    bg=current_theme["bg"],
-    activebackground=current_theme["button_active"],
     bd=0,
     highlightthickness=0,
     relief='flat',
@@ -897,21 +1103,17 @@ settings_button = tk.Button(
 
 settings_button.image = settings_photo  # Сохраняем ссылку на изображение
 settings_button.pack(fill='both', expand=True)
-settings_button.bind("<Enter>", on_enter_settings)
-settings_button.bind("<Leave>", on_leave_settings)
+theme.register(settings_button, bg="bg", activebackground="button_active")
+theme.add_hover(settings_button)  # подсветка при наведении цветом текущей темы
 
 # Создаём кнопку переключения в режим виджета и обратно
-pin_frame = tk.Frame(root, bg=current_theme["bg"], bd=0, highlightthickness=0)
-pin_frame.place(x=10, y=10, width=30, height=30)
-pin_img = Image.open(resource_path("./resources/images/pin_icon.ico"))
-pin_img = pin_img.resize((30, 30), Image.LANCZOS)
-pin_photo = ImageTk.PhotoImage(pin_img)
+pin_frame = theme.register(tk.Frame(root, bd=0, highlightthickness=0), bg="bg")
+pin_frame.place(x=px(10), y=px(10), width=px(30), height=px(30))
+pin_photo = assets.photo(resource_path("./resources/images/pin_icon.ico"), (30, 30))
 
 pin_button = tk.Button(
    pin_frame,
    image=pin_photo,
-   bg=current_theme["bg"],
-   activebackground=current_theme["button_active"],
    bd=0,
    highlightthickness=0,
    relief='flat',
@@ -920,21 +1122,17 @@ pin_button = tk.Button(
 
 pin_button.image = pin_photo  # Сохраняем ссылку на изображение
 pin_button.pack(fill='both', expand=True)
-pin_button.bind("<Enter>", on_enter_pin)
-pin_button.bind("<Leave>", on_leave_pin)
+theme.register(pin_button, bg="bg", activebackground="button_active")
+theme.add_hover(pin_button)  # подсветка при наведении цветом текущей темы
 
 # Создаём кнопку сворачивания в трей
-tray_frame = tk.Frame(root, bg=current_theme["bg"], bd=0, highlightthickness=0)
-tray_frame.place(x=360, y=10, width=30, height=30)
-tray_img = Image.open(resource_path('./resources/images/minimize-tray-button.png'))
-tray_img = tray_img.resize((30, 30), Image.LANCZOS)
-tray_photo = ImageTk.PhotoImage(tray_img)
+tray_frame = theme.register(tk.Frame(root, bd=0, highlightthickness=0), bg="bg")
+tray_frame.place(x=px(360), y=px(10), width=px(30), height=px(30))
+tray_photo = assets.photo(resource_path('./resources/images/minimize-tray-button.png'), (30, 30))
 
 tray_button = tk.Button(
     tray_frame,
     image=tray_photo,
-    bg=current_theme["bg"],
-    activebackground=current_theme["button_active"],
     bd=0,
     highlightthickness=0,
     relief='flat',
@@ -943,13 +1141,32 @@ tray_button = tk.Button(
 
 tray_button.image = tray_photo  # Сохраняем ссылку на изображение
 tray_button.pack(fill='both', expand=True)
-tray_button.bind("<Enter>", on_enter_tray)
-tray_button.bind("<Leave>", on_leave_tray)
+theme.register(tray_button, bg="bg", activebackground="button_active")
+theme.add_hover(tray_button)  # подсветка при наведении цветом текущей темы
+
+# Изменения настроек применяются только там, где они нужны
+subscribe_settings()
 
-# Запускаем обновление
-update_time()
-update_weather_data()
-update_auto_theme()
+# Сразу показываем последние сохранённые данные, свежие запрашиваются в фоне
+show_snapshot()
+
+# Запускаем обновление (часы, автотема и смена городов работают, только пока окно видно;
+# часы и смена городов - ещё и вне режима виджета).
+# Погода обновляется и в трее - от неё зависят звуки
+lifecycle.add_task("clock", clock.next_delay, clock.tick, (MAIN_WINDOW, CLOCK_LABEL))
+lifecycle.add_task("weather", 60000, update_weather_data, run_now=False)  # первый раз - в start_first_fetch
+lifecycle.add_task("auto_theme", 60000, update_auto_theme, MAIN_WINDOW)
+lifecycle.add_task("city_cycle", CITY_CYCLE_INTERVAL, show_next_city, (MAIN_WINDOW, CITY_LABEL), run_now=False)
+lifecycle.add_task("forecast", FORECAST_INTERVAL, update_forecast, MAIN_WINDOW, run_now=False)  # первый раз - после первой погоды
+
+# Снег создаём, когда окно уже на экране и главный цикл свободен
+if SNOW_IS_ON:
+    root.after_idle(show_snow)
+
+print(f"Запуск: импорт {IMPORT_TIME * 1000:.0f} мс, окно через {WINDOW_TIME * 1000:.0f} мс")
+if STARTUP_BENCHMARK:
+    print(f"STARTUP import_ms={IMPORT_TIME * 1000:.1f} window_ms={WINDOW_TIME * 1000:.1f}", flush=True)
+    root.after_idle(quit_app)
 
 # Показываем элементы если не в режиме виджета
 if not WIDGET_MODE:
@@ -959,16 +1176,23 @@ if not WIDGET_MODE:
     condition_label.pack(pady=3)
     icon_label.pack(pady=3)
     author_label.pack(pady=3, side=tk.BOTTOM)
+    forecast_panel.frame.pack(side=tk.BOTTOM)  # над строкой автора
 
 # Запуск основного цикла приложения
 try:
     root.protocol("WM_DELETE_WINDOW", on_closing)
     root.mainloop()
 finally:
+    # Дописываем отложенные изменения настроек
+    settings.flush()
+    
+    # Останавливаем фоновые загрузки
+    fetch_worker.shutdown()
+    weather_fetcher.shutdown()
+    http_client.close()
     # При выходе из приложения останавливаем все звуки
     if SOUND_INITIALIZED:
-        mixer.quit()
-    pygame.quit()
+        sound_bank.quit()
     # Останавливаем снег, если он запущен
     if snow_overlay is not None:
         snow_overlay.quit()
\ No newline at end of file
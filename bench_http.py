@@ -0,0 +1,107 @@
+"""Замер задержки одного обновления погоды (IP + погода + иконка) на локальном сервере-заглушке.
+Сравниваются старый способ (urlopen/requests.get, новое соединение на каждый запрос)
+и общий HTTP-клиент WeatherClient.HttpClient (постоянные соединения из пула).
+Запуск: python bench_http.py [--refreshes 50] [--handshake-ms 30] [--rtt-ms 5]"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+import requests
+from WeatherClient import HttpClient
+
+WEATHER = json.dumps({
+    "location": {"name": "Saint Petersburg"},
+    "current": {"temp_c": 1.0, "temp_f": 33.8, "condition": {"text": "Light snow", "icon": "/icon.png", "code": 1213}}
+}).encode()
+
+with open('./resources/images/no_connection.png', 'rb') as f:
+    ICON = f.read()
+
+
+def make_handler(handshake_ms, rtt_ms):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # поддержка keep-alive
+        disable_nagle_algorithm = True  # как у реальных серверов, иначе ответы ждут задержанного ACK
+
+        def setup(self):
+            # Новое соединение: имитируем стоимость установки TCP + TLS
+            time.sleep(handshake_ms / 1000)
+            super().setup()
+
+        def do_GET(self):
+            time.sleep(rtt_ms / 1000)
+            if self.path.startswith("/ip"):
+                body, content_type = b"192.0.2.1", "text/plain"
+            elif self.path.startswith("/v1/current.json"):
+                body, content_type = WEATHER, "application/json"
+            else:
+                body, content_type = ICON, "image/png"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def refresh_before(base):
+    """Обновление так, как оно делалось раньше: каждый запрос - новое соединение"""
+    urlopen(Request(base + "/ip")).read()
+    requests.get(base + "/v1/current.json?q=192.0.2.1&aqi=yes&lang=ru").json()
+    urlopen(base + "/icon.png").read()
+
+
+def refresh_after(base, client):
+    """Обновление через общий HTTP-клиент"""
+    client.get_text(base + "/ip")
+    client.get_json(base + "/v1/current.json", {"q": "192.0.2.1", "aqi": "yes", "lang": "ru"})
+    client.get_bytes(base + "/icon.png")
+
+
+def measure(func, refreshes):
+    timings = []
+    for _ in range(refreshes):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<28} среднее {statistics.mean(timings):7.2f} мс   медиана {statistics.median(timings):7.2f} мс   p95 {p95:7.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refreshes", type=int, default=50, help="количество обновлений в каждом замере")
+    parser.add_argument("--handshake-ms", type=float, default=30, help="имитация стоимости нового соединения, мс")
+    parser.add_argument("--rtt-ms", type=float, default=5, help="имитация задержки ответа, мс")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.handshake_ms, args.rtt_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"Заглушка {base}: установка соединения {args.handshake_ms} мс, ответ {args.rtt_ms} мс, "
+          f"{args.refreshes} обновлений (3 запроса в каждом)")
+
+    client = HttpClient()
+    report("До (urlopen + requests.get)", measure(lambda: refresh_before(base), args.refreshes))
+    report("После (HttpClient)", measure(lambda: refresh_after(base, client), args.refreshes))
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Замер времени одного кадра снега на рабочем столе при разном количестве снежинок.
+Сравниваются прежняя отрисовка (удаление и создание всех овалов в каждом кадре),
+текущая отрисовка овалами (создаются один раз и только перемещаются)
+и растровая (все снежинки в одной картинке, SNOW_BACKEND = "raster").
+Запуск: python bench_snow.py [--frames 200] [--counts 80 500 2000]"""
+
+import argparse
+import statistics
+import time
+import tkinter as tk
+from SnowOnDesktop import SnowDesktopOverlay
+
+
+def legacy_frame(overlay):
+    """Кадр так, как он рисовался раньше: все овалы удаляются и создаются заново"""
+    overlay.canvas.delete("snow")
+    overlay.simulation.step()
+    for x1, y1, x2, y2 in overlay.simulation.bounding_boxes().tolist():
+        overlay.canvas.create_oval(x1, y1, x2, y2, fill='white', outline='white', tags='snow')
+
+
+def measure(overlay, frame, frames):
+    """Время кадра в мс, включая перерисовку холста"""
+    timings = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        frame()
+        overlay.root.update_idletasks()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, count, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<24} {count:>6} снежинок   медиана {statistics.median(timings):7.2f} мс   p95 {p95:7.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200, help="количество кадров в каждом замере")
+    parser.add_argument("--counts", type=int, nargs="+", default=[80, 500, 2000], help="количество снежинок")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+
+    for count in args.counts:
+        overlay = SnowDesktopOverlay(root, snow_count=count, backend="ovals")
+        overlay.root.deiconify()
+        overlay.canvas.delete("snow")
+        report("Удаление и создание", count, measure(overlay, lambda: legacy_frame(overlay), args.frames))
+        overlay.quit()
+
+        for backend, name in (("ovals", "Овалы (coords)"), ("raster", "Растр (одна картинка)")):
+            overlay = SnowDesktopOverlay(root, snow_count=count, backend=backend)
+            overlay.root.deiconify()
+            report(name, count, measure(overlay, overlay.render_frame, args.frames))
+            overlay.quit()
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Замер физики и растеризации снега без окна и без дисплея (подходит для Linux-сервера и CI).
+Для каждого размера экрана и числа снежинок выводятся шаги в секунду и пиковое выделение
+памяти за кадр. С --max-alloc-kb скрипт завершается с ошибкой, если шаг физики выделяет больше.
+Запуск: python bench_snow_headless.py [--frames 300] [--counts 80 2000 20000] [--max-alloc-kb 64]"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from SnowPhysics import SnowSimulation, SnowRasterizer
+
+SCREENS = {
+    "1366x768": (1366, 768),
+    "1920x1080": (1920, 1080),
+    "3840x2160": (3840, 2160)
+}
+
+
+def spread(simulation):
+    """Разбросать снежинки по всей высоте экрана, как в установившемся снегопаде.
+    Иначе все они только что появились над экраном, ни одна не долетает до низа за время замера
+    и возврат упавших снежинок наверх (со своими выделениями памяти) не попадает в замер"""
+    simulation.y[:] = simulation.rng.uniform(-100, simulation.height, simulation.count)
+
+
+def physics_frame(simulation, rasterizer):
+    """Кадр для отрисовки овалами: шаг физики и координаты снежинок"""
+    simulation.step()
+    simulation.bounding_boxes()
+
+
+def raster_frame(simulation, rasterizer):
+    """Кадр для растровой отрисовки: шаг физики и растеризация в буфер"""
+    simulation.step()
+    rasterizer.rasterize()
+
+
+def steps_per_second(frame, simulation, rasterizer, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame(simulation, rasterizer)
+    return frames / (time.perf_counter() - start)
+
+
+def allocation_per_frame(frame, simulation, rasterizer, frames):
+    """Наибольшее пиковое выделение памяти за один кадр, КиБ (NumPy учитывается tracemalloc)"""
+    worst = 0
+    tracemalloc.start()
+    for _ in range(frames):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame(simulation, rasterizer)
+        worst = max(worst, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return worst / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300, help="количество кадров в каждом замере")
+    parser.add_argument("--counts", type=int, nargs="+", default=[80, 2000, 20000, 50000], help="количество снежинок")
+    parser.add_argument("--screens", nargs="+", default=list(SCREENS), choices=list(SCREENS), help="размеры экрана")
+    parser.add_argument("--max-alloc-kb", type=float, default=None,
+                        help="допустимое выделение памяти за шаг физики, КиБ (для проверки регрессий)")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'экран':<10} {'снежинок':>8}   {'режим':<8} {'шагов/с':>10} {'КиБ/кадр':>10}")
+    for screen in args.screens:
+        width, height = SCREENS[screen]
+        for count in args.counts:
+            for mode, frame in (("физика", physics_frame), ("растр", raster_frame)):
+                simulation = SnowSimulation(count, width, height, seed=1)
+                rasterizer = SnowRasterizer(simulation)
+                spread(simulation)
+                for _ in range(10):  # прогрев
+                    frame(simulation, rasterizer)
+
+                rate = steps_per_second(frame, simulation, rasterizer, args.frames)
+                allocated = allocation_per_frame(frame, simulation, rasterizer, min(args.frames, 50))
+                mark = ""
+                if frame is physics_frame and args.max_alloc_kb is not None and allocated > args.max_alloc_kb:
+                    failed = True
+                    mark = "  <- больше допустимого"
+                print(f"{screen:<10} {count:>8}   {mode:<8} {rate:>10.0f} {allocated:>10.1f}{mark}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Замер холодного запуска WinWeather.py: время импорта модулей и время до появления окна.
+Приложение запускается с флагом --startup-benchmark (выходит сразу после появления окна).
+Дополнительно показывается, сколько стоил бы импорт модулей, которые теперь загружаются лениво.
+Запуск: python bench_startup.py [--runs 5]"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Модули, которые загружаются при первом использовании, а не при запуске
+LAZY_MODULES = ["pygame", "pystray", "requests", "numpy", "PIL.ImageTk"]
+
+STARTUP_LINE = re.compile(r"STARTUP import_ms=([\d.]+) window_ms=([\d.]+)")
+
+
+def import_cost(module):
+    """Время импорта модуля в новом процессе, мс (None, если модуль не установлен)"""
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def run_app(timeout):
+    """Один запуск приложения: (импорт, окно - по часам приложения, окно - от старта процесса), мс"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "WinWeather.py", "--startup-benchmark"],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding="utf-8")
+    try:
+        for line in process.stdout:
+            match = STARTUP_LINE.search(line)
+            if match:
+                wall_ms = (time.perf_counter() - start) * 1000
+                return float(match.group(1)), float(match.group(2)), wall_ms
+        return None
+    finally:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def report(name, values):
+    print(f"{name:<36} медиана {statistics.median(values):7.1f} мс   мин. {min(values):7.1f} мс   макс. {max(values):7.1f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="количество запусков приложения")
+    parser.add_argument("--timeout", type=float, default=15, help="сколько ждать завершения приложения, с")
+    args = parser.parse_args()
+
+    print("Импорт модулей, отложенных до первого использования:")
+    for module in LAZY_MODULES:
+        cost = import_cost(module)
+        print(f"  {module:<12} " + ("не установлен" if cost is None else f"{cost:7.1f} мс"))
+
+    results = []
+    for _ in range(args.runs):
+        result = run_app(args.timeout)
+        if result is None:
+            print("Приложение завершилось, не сообщив время запуска")
+            return
+        results.append(result)
+
+    print(f"Запуск приложения ({args.runs} раз):")
+    report("Импорт модулей", [r[0] for r in results])
+    report("Окно (от начала скрипта)", [r[1] for r in results])
+    report("Окно (от старта процесса)", [r[2] for r in results])
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@ from pygame import mixer
 import io
 from urllib.parse import urlparse
 import threading
+from Conditions import classify
 
 WIDTH = 400
 HEIGHT = 320
@@ -64,14 +65,12 @@ THEMES = {
 
 
 # Добавьте эту функцию для загрузки и обработки анимированных иконок
-def load_animated_icon(icon_url, condition):
+def load_animated_icon(icon_url, code):
     """Загружает и обрабатывает анимированные иконки для осадков"""
     try:
-        # Проверяем, нужно ли анимировать эту иконку
-        # condition_lower = condition.lower()
-        condition_lower = "лив"
-        if any(keyword in condition_lower for keyword in ["дожд", "лив", "rain", "гроз", "thunder", \
-                                                          "сне", "snow", "blizzard",  "лед", "град", "ice pellets"]):
+        # Анимируем только иконки с осадками (вид осадков - по коду погоды)
+        precipitation, intensity = classify(code)
+        if precipitation is not None:
             # Получаем имя файла из URL
             parsed_url = urlparse(icon_url)
             filename = os.path.basename(parsed_url.path)
@@ -91,8 +90,7 @@ def load_animated_icon(icon_url, condition):
                 
                 for i in range(20, 30):  # 4 кадра анимации
                     frame = original_img.copy()
-                    if "дожд" in condition_lower or "лив" in condition_lower \
-                            or "гроз"  in condition_lower or "rain" in condition_lower or "thunder" in condition_lower:
+                    if precipitation in ("rain", "thunder"):
                         # Добавляем капли дождя (синие косые линии)
                         for x in range(16, frame.width, 8):  # количество капель в строке (от 8 до width с шагом 8)
                             for y in range(i * 2, frame.height, 16):  # движение капель сверху вниз
@@ -101,8 +99,7 @@ def load_animated_icon(icon_url, condition):
                                         if y + dy < frame.height:
                                             frame.putpixel((x - dy, y + dy), (31, 133, 87, 200))
                     
-                    elif "сне" in condition_lower or "snow" in condition_lower or "blizzard" in condition_lower \
-                            or "лед" in condition_lower or "град" in condition_lower or "ice pellets" in condition_lower:
+                    elif precipitation in ("snow", "ice_pellets"):
                         # Добавляем снежинки (белые точки)
                         for x in range(16, frame.width, 16):
                             for y in range(i * 2, frame.height, 16):
@@ -292,7 +289,7 @@ def apply_theme():
 
 
 # Функция для воспроизведения звуков погоды
-def play_weather_sounds(condition):
+def play_weather_sounds(precipitation):
     global current_sound
     
     # Если произошла ошибка - звук не включаем
@@ -305,25 +302,13 @@ def play_weather_sounds(condition):
     if current_sound:
         current_sound.stop()
     
-    # Определяем, какие звуки нужно воспроизвести
-    condition_lower = condition.lower()
-    sound_file = None
+    # Нет осадков - нет звука
+    if precipitation is None:
+        return
     
     try:
-        sound_file = None
-        
-        if "гроз" in condition_lower or "thunder" in condition_lower:
-            # Воспроизводим звук грозы
-            sound_file = resource_path('./resources/sounds/thunder.wav')
-        elif "лед" in condition_lower or "град" in condition_lower or "ice pellets" in condition_lower:
-            # Воспроизводим звук града
-            sound_file = resource_path('./resources/sounds/ice_pellets.wav')
-        elif "дожд" in condition_lower or "лив" in condition_lower or "rain" in condition_lower:
-            # Воспроизводим звук дождя
-            sound_file = resource_path('./resources/sounds/rain.wav')
-        elif "сне" in condition_lower or "snow" in condition_lower or "blizzard" in condition_lower:
-            # Воспроизводим звук снега
-            sound_file = resource_path('./resources/sounds/snow.wav')
+        # Звук по виду осадков: thunder.wav, ice_pellets.wav, rain.wav, snow.wav
+        sound_file = resource_path(f'./resources/sounds/{precipitation}.wav')
         
         if sound_file and os.path.exists(sound_file):
             try:
@@ -361,17 +346,19 @@ def get_weather_data():
         temper = sign + str(int(current_weather["current"]["temp_c"]) if TEMP_UNIT == "°C" else int(current_weather["current"]["temp_f"]))
         condition = current_weather["current"]["condition"]["text"]
         icon_url = "https:" + current_weather["current"]["condition"]["icon"]
+        code = current_weather["current"]["condition"]["code"]
         
         # Воспроизводим звуки в соответствии с погодой
-        play_weather_sounds(condition)
+        play_weather_sounds(classify(code)[0])
         
     except:  # иначе отображаем сообщение об ошибке
         print(f"Ошибка получения погоды: {e}")
         temper = ""
         condition = "Нет связи :(" if LANGUAGE == "ru" else "No connection :("
         icon_url = resource_path('./resources/images/no_connection.png')
+        code = None
             
-    return temper, condition, icon_url 
+    return temper, condition, icon_url, code
 
 
 # Функция для обновления даты и времени
@@ -383,7 +370,7 @@ def update_time():
 
 # Функция для обновления данных о погоде
 def update_weather_data():
-    temper, condition, icon_url = get_weather_data()  # Получаем текущие данные
+    temper, condition, icon_url, code = get_weather_data()  # Получаем текущие данные
     
     temper_label.config(text=f"{temper}{TEMP_UNIT}")  # Обновляем текст Label
     condition_label.config(text=f"{condition}")  # Обновляем текст Label
@@ -395,7 +382,7 @@ def update_weather_data():
                 response = requests.get(icon_url)
                 if response.status_code == 200:
                     # Пытаемся создать анимированную иконку
-                    animated_frames = load_animated_icon(icon_url, condition)
+                    animated_frames = load_animated_icon(icon_url, code)
                     
                     if animated_frames:
                         # Отображаем анимированную иконку